@@ -1,72 +1,65 @@
 import streamlit as st
-import pandas as pd
+
+import catalog
+import dataset
+import query
+import ranking
+import search_ui
 
 # 파일 경로 설정
 PREDEFINED_FILE_PATH = '202506.xlsx'
 
-# 데이터 로드
+# 데이터 로드 (검색 조건 목록, 집계는 선택된 검색 백엔드가 계산)
 def load_data():
     try:
-        df = pd.read_excel(PREDEFINED_FILE_PATH)
-        return df
+        return catalog.shared_catalog(PREDEFINED_FILE_PATH)
     except Exception as e:
         st.error(f"파일 로드 중 오류 발생: {e}")
         return None
 
-# 데이터 필터링 함수
-def filter_data(df, start_date, end_date, arrival_port, arrival_country, min_containers):
-    df = df[(df['선적일'] >= pd.to_datetime(start_date)) & (df['선적일'] <= pd.to_datetime(end_date))]
-    
-    if arrival_country != 'All':
-        df = df[df['도착지국가'] == arrival_country]
-    if arrival_port != 'All':
-        df = df[df['도착항'] == arrival_port]
-    
-    grouped = df.groupby('수출자').agg({'컨테이너수': 'sum'}).reset_index()
-    grouped = grouped[grouped['컨테이너수'] >= min_containers]
-    filtered_df = df[df['수출자'].isin(grouped['수출자'])]
-    
-    return filtered_df
+# 데이터 필터링 함수 (검색 실행은 search_ui 공용 함수)
+def filter_data(start_date, end_date, arrival_port, arrival_country, min_containers, outputs=('exporters',)):
+    spec = query.make_spec(start_date, end_date, arrival_country=arrival_country, arrival_port=arrival_port, min_containers=min_containers)
+    return search_ui.run_search(PREDEFINED_FILE_PATH, spec, outputs)
 
 # 앱 UI
 def app():
     st.title("🔍 부산항 컨테이너 수출 고객 검색기")
 
-    df = load_data()
-    if df is not None:
+    dim_catalog = load_data()
+    if dim_catalog is not None:
         st.sidebar.header("🚩 검색 조건")
         st.sidebar.markdown(" ")
         # 날짜 선택
-        min_date = df['선적일'].min()
-        max_date = df['선적일'].max()
+        min_date = dim_catalog['min_date']
+        max_date = dim_catalog['max_date']
         start_date = st.sidebar.date_input("📅 시작일", min_value=min_date, max_value=max_date, value=min_date)
         end_date = st.sidebar.date_input("📅 종료일", min_value=min_date, max_value=max_date, value=max_date)
 
         # 도착지국가 필터
-        arrival_country = st.sidebar.selectbox("🌎 도착지국가", ['All'] + sorted(df['도착지국가'].dropna().astype(str).unique().tolist()))
+        arrival_country = st.sidebar.selectbox("🌎 도착지국가", ['All'] + catalog.options(dim_catalog, '도착지국가'))
 
         # 도착항 필터 (도착지국가에 따라 동적으로 변함)
-        if arrival_country != 'All':
-            ports = df[df['도착지국가'] == arrival_country]['도착항'].dropna().astype(str).unique()
-        else:
-            ports = df['도착항'].dropna().astype(str).unique()
-        arrival_port = st.sidebar.selectbox("⚓ 도착항", ['All'] + sorted(ports.tolist()))
+        ports = catalog.options(dim_catalog, '도착항', '도착지국가', arrival_country)
+        arrival_port = st.sidebar.selectbox("⚓ 도착항", ['All'] + ports)
 
         # 최소 컨테이너 수 필터
         min_containers = st.sidebar.selectbox("📦 최소 컨테이너 수", [0, 10, 50, 100, 500, 1000, 10000])
 
+        # 표시할 순위 수 (상위 일부만 정렬)
+        rank_limit = st.sidebar.selectbox("🏅 표시할 순위 수", ranking.RANK_LIMIT_OPTIONS)
+
         if st.sidebar.button("검색"):
-            result_df = filter_data(df, start_date, end_date, arrival_port, arrival_country, min_containers)
+            result = filter_data(start_date, end_date, arrival_port, arrival_country, min_containers)
             
-            if not result_df.empty:
-                grouped = result_df.groupby('수출자').agg({'컨테이너수': 'sum'}).reset_index()
-                grouped = grouped.sort_values(by='컨테이너수', ascending=False)
-                grouped['순위'] = grouped['컨테이너수'].rank(ascending=False, method='min')
-                grouped = grouped[['순위', '수출자', '컨테이너수']].reset_index(drop=True)
+            if result is not None and not result['exporters'].empty:
+                grouped = ranking.top_ranked(result['exporters'], '수출자', rank_limit)
 
                 # ✅ 인덱스 없이 결과 표시
                 st.write("🚢 수출자별 총 컨테이너 수", grouped)
-            else:
+                if len(grouped) < len(result['exporters']):
+                    st.caption(f"상위 {len(grouped)}개 / 전체 {len(result['exporters'])}개 (표시할 순위 수를 늘리면 더 볼 수 있습니다)")
+            elif result is not None:
                 st.warning("조건에 맞는 데이터가 없습니다.")
     else:
         st.warning("파일을 불러올 수 없습니다.")
@@ -1,85 +1,75 @@
 import streamlit as st
-import pandas as pd
+
+import catalog
+import dataset
+import exporter_index
+import query
+import ranking
+import search_ui
 
 # 📁 파일 경로 설정
-PREDEFINED_FILE_PATH = 'combined.xlsx'
+# (ingest.py 로 만든 월별 저장소가 있으면 저장소를 우선 사용)
+PREDEFINED_FILE_PATH = dataset.pick_source(dataset.STORE_DIR, 'combined.xlsx')
 
-# 📄 데이터 로드
+# 📄 데이터 로드 (검색 조건 목록, 집계는 선택된 검색 백엔드가 계산)
 def load_data():
     try:
-        df = pd.read_excel(PREDEFINED_FILE_PATH, parse_dates=['선적일'])  # 날짜 자동 변환
-        return df
+        return catalog.shared_catalog(PREDEFINED_FILE_PATH)
     except Exception as e:
         st.error(f"파일 로드 중 오류 발생: {e}")
         return None
 
-# 🔍 조건 기반 필터링 함수
-def filter_data(df, start_date, end_date, loading_port, arrival_port, arrival_country, min_containers):
-    df = df[(df['선적일'] >= pd.to_datetime(start_date)) & (df['선적일'] <= pd.to_datetime(end_date))]
-
-    if loading_port != 'All':
-        df = df[df['선적항'] == loading_port]
-    if arrival_country != 'All':
-        df = df[df['도착지국가'] == arrival_country]
-    if arrival_port != 'All':
-        df = df[df['도착항'] == arrival_port]
-
-    grouped = df.groupby('수출자').agg({'컨테이너수': 'sum'}).reset_index()
-    grouped = grouped[grouped['컨테이너수'] >= min_containers]
-    filtered_df = df[df['수출자'].isin(grouped['수출자'])]
-
-    return filtered_df
+# 🔍 조건 기반 필터링 함수 (검색 실행은 search_ui 공용 함수)
+def filter_data(start_date, end_date, loading_port, arrival_port, arrival_country, min_containers, outputs=('exporters', 'carriers')):
+    spec = query.make_spec(start_date, end_date, loading_port, arrival_country, arrival_port, min_containers)
+    return search_ui.run_search(PREDEFINED_FILE_PATH, spec, outputs)
 
 # 🧭 Streamlit 앱 UI
 def app():
     st.title("🔍 국내 컨테이너 수출 고객 탐색기")
 
-    df = load_data()
-    if df is not None:
+    dim_catalog = load_data()
+    if dim_catalog is not None:
         st.sidebar.header("🚩 조건 기반 검색")
         st.sidebar.markdown(" ")
 
         # 날짜 필터
-        min_date = df['선적일'].min()
-        max_date = df['선적일'].max()
+        min_date = dim_catalog['min_date']
+        max_date = dim_catalog['max_date']
         start_date = st.sidebar.date_input("📅 시작일", min_value=min_date, max_value=max_date, value=min_date)
         end_date = st.sidebar.date_input("📅 종료일", min_value=min_date, max_value=max_date, value=max_date)
 
         # 선적항 필터
-        loading_port = st.sidebar.selectbox("⚓ 선적항", ['All'] + sorted(df['선적항'].dropna().astype(str).unique().tolist()))
+        loading_port = st.sidebar.selectbox("⚓ 선적항", ['All'] + catalog.options(dim_catalog, '선적항'))
 
         # 도착지 국가 및 항 필터
-        arrival_country = st.sidebar.selectbox("🌎 도착지국가", ['All'] + sorted(df['도착지국가'].dropna().astype(str).unique().tolist()))
+        arrival_country = st.sidebar.selectbox("🌎 도착지국가", ['All'] + catalog.options(dim_catalog, '도착지국가', '선적항', loading_port))
 
-        if arrival_country != 'All':
-            ports = df[df['도착지국가'] == arrival_country]['도착항'].dropna().astype(str).unique()
-        else:
-            ports = df['도착항'].dropna().astype(str).unique()
-        arrival_port = st.sidebar.selectbox("⚓ 도착항", ['All'] + sorted(ports.tolist()))
+        ports = catalog.options(dim_catalog, '도착항', '도착지국가', arrival_country)
+        arrival_port = st.sidebar.selectbox("⚓ 도착항", ['All'] + ports)
 
         # 최소 컨테이너 수 필터
         min_containers = st.sidebar.selectbox("📦 최소 컨테이너 수", [0, 10, 50, 100, 500, 1000, 10000])
 
+        # 표시할 순위 수 (상위 일부만 정렬)
+        rank_limit = st.sidebar.selectbox("🏅 표시할 순위 수", ranking.RANK_LIMIT_OPTIONS)
+
         # ▶ 조건 기반 검색 버튼
         if st.sidebar.button("조건 검색"):
             with st.spinner("⌛ 조건 기반 데이터를 조회 중입니다..."):
-                result_df = filter_data(df, start_date, end_date, loading_port, arrival_port, arrival_country, min_containers)
+                result = filter_data(start_date, end_date, loading_port, arrival_port, arrival_country, min_containers)
 
-                if not result_df.empty:
+                if result is not None and not result['exporters'].empty:
                     # 수출자별 컨테이너 수
-                    grouped = result_df.groupby('수출자').agg({'컨테이너수': 'sum'}).reset_index()
-                    grouped = grouped.sort_values(by='컨테이너수', ascending=False)
-                    grouped['순위'] = grouped['컨테이너수'].rank(ascending=False, method='min')
-                    grouped = grouped[['순위', '수출자', '컨테이너수']].reset_index(drop=True)
+                    grouped = ranking.top_ranked(result['exporters'], '수출자', rank_limit)
                     st.write("### 🫅 수출자별 총 컨테이너 수", grouped)
+                    if len(grouped) < len(result['exporters']):
+                        st.caption(f"상위 {len(grouped)}개 / 전체 {len(result['exporters'])}개 (표시할 순위 수를 늘리면 더 볼 수 있습니다)")
 
                     # 컨테이너 선사별 현황
-                    port_grouped = result_df.groupby('컨테이너선사').agg({'컨테이너수': 'sum'}).reset_index()
-                    port_grouped = port_grouped.sort_values(by='컨테이너수', ascending=False)
-                    port_grouped['순위'] = port_grouped['컨테이너수'].rank(ascending=False, method='min')
-                    port_grouped = port_grouped[['순위', '컨테이너선사', '컨테이너수']].reset_index(drop=True)
+                    port_grouped = ranking.top_ranked(result['carriers'], '컨테이너선사', rank_limit)
                     st.write("### 🚢 컨테이너선사별 총 컨테이너 수", port_grouped)
-                else:
+                elif result is not None:
                     st.warning("조건에 맞는 데이터가 없습니다.")
         else:
             st.info("좌측 사이드바에서 검색 조건을 설정하고 '조건 검색' 버튼을 눌러주세요.")
@@ -94,21 +84,22 @@ def app():
         if exporter_search_btn:
             if exporter_name.strip():
                 with st.spinner("⌛ 수출자 데이터를 조회 중입니다..."):
-                    # ✅ 시작일 ~ 종료일 필터 먼저 적용
-                    date_filtered_df = df[(df['선적일'] >= pd.to_datetime(start_date)) &
-                                          (df['선적일'] <= pd.to_datetime(end_date))]
+                    # ✅ 수출자 이름 색인 검색 (대소문자 무시, 초성 가능)
+                    names = exporter_index.shared_index(PREDEFINED_FILE_PATH).search_names(exporter_name)
 
-                    # ✅ 수출자 이름 포함 검색
-                    filtered = date_filtered_df[date_filtered_df['수출자'].astype(str).str.contains(exporter_name.strip(), na=False)]
+                    # ✅ 찾은 수출자의 시작일 ~ 종료일 선적항-도착항별 합계 (선택된 검색 백엔드가 계산)
+                    result = None
+                    if names:
+                        spec = query.make_spec(start_date, end_date, exporters=names)
+                        result = search_ui.run_search(PREDEFINED_FILE_PATH, spec, ['routes'])
 
-                    if not filtered.empty:
-                        grouped_exporter = filtered.groupby(['수출자', '선적항', '도착항']).agg({'컨테이너수': 'sum'}).reset_index()
-                        grouped_exporter = grouped_exporter.sort_values(by='컨테이너수', ascending=False).reset_index(drop=True)
+                    if result is not None and not result['routes'].empty:
+                        grouped_exporter = result['routes'].sort_values(by='컨테이너수', ascending=False).reset_index(drop=True)
                         st.markdown("---")
                         st.subheader(f"📦 수출자 '{exporter_name}' 선적항-도착항별 컨테이너 수")
                         st.dataframe(grouped_exporter)
-                    else:
-                        st.warning(f"'{exporter_name}' 에 해당하는 수출자를 찾을 수 없습니다. 대소문자를 구분해 입력해 주세요.")
+                    elif result is not None or not names:
+                        st.warning(f"'{exporter_name}' 에 해당하는 수출자를 찾을 수 없습니다.")
             else:
                 st.warning("수출자 이름을 입력해 주세요.")
     else:
@@ -1,50 +1,44 @@
 import streamlit as st
 import pandas as pd
 
+import catalog
+import dataset
+import exporter_index
+import query
+import ranking
+import search_ui
+
 # 📁 파일 경로 설정
-PREDEFINED_FILE_PATH = 'combined2.xlsx'
+# (ingest.py 로 만든 월별 저장소가 있으면 저장소를 우선 사용)
+PREDEFINED_FILE_PATH = dataset.pick_source(dataset.STORE_DIR, 'combined2.xlsx')
 
-# 📄 데이터 로드
-@st.cache_data
+# 📄 데이터 로드 (검색 조건 목록, 집계는 선택된 검색 백엔드가 계산)
 def load_data():
     try:
-        df = pd.read_excel(PREDEFINED_FILE_PATH, parse_dates=['선적일'])
-        return df
+        return catalog.shared_catalog(PREDEFINED_FILE_PATH)
     except Exception as e:
         st.error(f"파일 로드 중 오류 발생: {e}")
         return None
 
-# 🔍 조건 기반 필터링 함수
-def filter_data(df, start_date, end_date, loading_port, arrival_port, arrival_country, min_containers):
-    df = df[(df['선적일'] >= pd.to_datetime(start_date)) & (df['선적일'] <= pd.to_datetime(end_date))]
-
-    if loading_port != 'All':
-        df = df[df['선적항'] == loading_port]
-    if arrival_country != 'All':
-        df = df[df['도착지국가'] == arrival_country]
-    if arrival_port != 'All':
-        df = df[df['도착항'] == arrival_port]
-
-    grouped = df.groupby('수출자').agg({'컨테이너수': 'sum'}).reset_index()
-    grouped = grouped[grouped['컨테이너수'] >= min_containers]
-    filtered_df = df[df['수출자'].isin(grouped['수출자'])]
-
-    return filtered_df
+# 🔍 조건 기반 필터링 함수 (검색 실행은 search_ui 공용 함수)
+def filter_data(start_date, end_date, loading_port, arrival_port, arrival_country, min_containers, outputs=('exporters', 'carriers')):
+    spec = query.make_spec(start_date, end_date, loading_port, arrival_country, arrival_port, min_containers)
+    return search_ui.run_search(PREDEFINED_FILE_PATH, spec, outputs)
 
 # 🧭 Streamlit 앱 UI
 def app():
     st.title("국내 컨테이너 수출 고객 탐색기")
     st.write("📊 데이터를 기반으로 고객을 탐색하고, 고객의 수출 컨테이너 현황을 분석합니다.")
 
-    df = load_data()
-    if df is None:
+    dim_catalog = load_data()
+    if dim_catalog is None:
         return
 
     st.sidebar.header("🚩 조건 기반 검색")
 
     # 날짜 필터
-    min_date = df['선적일'].min()
-    max_date = df['선적일'].max()
+    min_date = dim_catalog['min_date']
+    max_date = dim_catalog['max_date']
 
     # 초기값 설정
     if 'start_date' not in st.session_state:
@@ -59,13 +53,15 @@ def app():
         st.session_state.arrival_port = 'All'
     if 'min_containers' not in st.session_state:
         st.session_state.min_containers = 0
+    if 'rank_limit' not in st.session_state:
+        st.session_state.rank_limit = ranking.RANK_LIMIT_OPTIONS[0]
 
     # 날짜 선택
     st.session_state.start_date = st.sidebar.date_input("📅 시작일", min_value=min_date, max_value=max_date, value=st.session_state.start_date)
     st.session_state.end_date = st.sidebar.date_input("📅 종료일", min_value=min_date, max_value=max_date, value=st.session_state.end_date)
 
     # 선적항
-    loading_port_options = ['All'] + sorted(df['선적항'].dropna().astype(str).unique().tolist())
+    loading_port_options = ['All'] + catalog.options(dim_catalog, '선적항')
     try:
         loading_port_index = loading_port_options.index(st.session_state.loading_port)
     except ValueError:
@@ -73,7 +69,7 @@ def app():
     st.session_state.loading_port = st.sidebar.selectbox("⚓ 선적항", loading_port_options, index=loading_port_index)
 
     # 도착지국가
-    arrival_country_options = ['All'] + sorted(df['도착지국가'].dropna().astype(str).unique().tolist())
+    arrival_country_options = ['All'] + catalog.options(dim_catalog, '도착지국가', '선적항', st.session_state.loading_port)
     try:
         arrival_country_index = arrival_country_options.index(st.session_state.arrival_country)
     except ValueError:
@@ -81,11 +77,7 @@ def app():
     st.session_state.arrival_country = st.sidebar.selectbox("🌎 도착지국가", arrival_country_options, index=arrival_country_index)
 
     # 도착항
-    if st.session_state.arrival_country != 'All':
-        arrival_port_raw = df[df['도착지국가'] == st.session_state.arrival_country]['도착항'].dropna()
-    else:
-        arrival_port_raw = df['도착항'].dropna()
-    arrival_port_options = ['All'] + sorted(arrival_port_raw.astype(str).unique().tolist())
+    arrival_port_options = ['All'] + catalog.options(dim_catalog, '도착항', '도착지국가', st.session_state.arrival_country)
     try:
         arrival_port_index = arrival_port_options.index(st.session_state.arrival_port)
     except ValueError:
@@ -100,11 +92,17 @@ def app():
         container_index = 0
     st.session_state.min_containers = st.sidebar.selectbox("📦 최소 컨테이너 수", container_values, index=container_index)
 
+    # 표시할 순위 수 (상위 일부만 정렬)
+    try:
+        rank_limit_index = ranking.RANK_LIMIT_OPTIONS.index(st.session_state.rank_limit)
+    except ValueError:
+        rank_limit_index = 0
+    st.session_state.rank_limit = st.sidebar.selectbox("🏅 표시할 순위 수", ranking.RANK_LIMIT_OPTIONS, index=rank_limit_index)
+
     # ▶ 고객 검색
     if st.sidebar.button("고객 검색"):
         with st.spinner("⌛ 조건 기반 데이터를 조회 중입니다..."):
-            result_df = filter_data(
-                df,
+            result = filter_data(
                 st.session_state.start_date,
                 st.session_state.end_date,
                 st.session_state.loading_port,
@@ -113,19 +111,15 @@ def app():
                 st.session_state.min_containers
             )
 
-            if not result_df.empty:
-                grouped = result_df.groupby('수출자').agg({'컨테이너수': 'sum'}).reset_index()
-                grouped = grouped.sort_values(by='컨테이너수', ascending=False)
-                grouped['순위'] = grouped['컨테이너수'].rank(ascending=False, method='min')
-                grouped = grouped[['순위', '수출자', '컨테이너수']].reset_index(drop=True)
+            if result is not None and not result['exporters'].empty:
+                grouped = ranking.top_ranked(result['exporters'], '수출자', st.session_state.rank_limit)
                 st.write("### 🫅 수출자별 총 컨테이너 수", grouped)
+                if len(grouped) < len(result['exporters']):
+                    st.caption(f"상위 {len(grouped)}개 / 전체 {len(result['exporters'])}개 (표시할 순위 수를 늘리면 더 볼 수 있습니다)")
 
-                port_grouped = result_df.groupby('컨테이너선사').agg({'컨테이너수': 'sum'}).reset_index()
-                port_grouped = port_grouped.sort_values(by='컨테이너수', ascending=False)
-                port_grouped['순위'] = port_grouped['컨테이너수'].rank(ascending=False, method='min')
-                port_grouped = port_grouped[['순위', '컨테이너선사', '컨테이너수']].reset_index(drop=True)
+                port_grouped = ranking.top_ranked(result['carriers'], '컨테이너선사', st.session_state.rank_limit)
                 st.write("### 🚢 컨테이너선사별 총 컨테이너 수", port_grouped)
-            else:
+            elif result is not None:
                 st.warning("조건에 맞는 데이터가 없습니다.")
 
     # 🔍 수출자 분석
@@ -134,13 +128,14 @@ def app():
     if st.sidebar.button("현황 분석"):
         if exporter_name.strip():
             with st.spinner("⌛ 수출자 데이터를 조회 중입니다..."):
-                date_filtered_df = df[(df['선적일'] >= pd.to_datetime(st.session_state.start_date)) &
-                                      (df['선적일'] <= pd.to_datetime(st.session_state.end_date))]
-                filtered = date_filtered_df[date_filtered_df['수출자'].astype(str).str.contains(exporter_name.strip(), na=False)]
+                names = exporter_index.shared_index(PREDEFINED_FILE_PATH).search_names(exporter_name)
+                result = None
+                if names:
+                    spec = query.make_spec(st.session_state.start_date, st.session_state.end_date, exporters=names)
+                    result = search_ui.run_search(PREDEFINED_FILE_PATH, spec, ['detail'])
 
-                if not filtered.empty:
-                    grouped_exporter = filtered.groupby(['수출자', '선적항', '도착지국가', '도착항']).agg({'컨테이너수': 'sum'}).reset_index()
-                    grouped_exporter = grouped_exporter.sort_values(by='컨테이너수', ascending=False).reset_index(drop=True)
+                if result is not None and not result['detail'].empty:
+                    grouped_exporter = result['detail'].sort_values(by='컨테이너수', ascending=False).reset_index(drop=True)
 
                     # ✅ 합계 행 추가
                     total_sum = grouped_exporter['컨테이너수'].sum()
@@ -156,7 +151,7 @@ def app():
                     st.markdown("---")
                     st.subheader(f"📦 '{exporter_name}' 선적항-도착항 컨테이너 상세")
                     st.dataframe(grouped_exporter)
-                else:
+                elif result is not None or not names:
                     st.warning(f"'{exporter_name}' 에 해당하는 수출자를 찾을 수 없습니다.")
         else:
             st.warning("수출자 이름을 입력해 주세요.")
@@ -1,8 +1,67 @@
+import io
+from concurrent.futures import FIRST_COMPLETED, wait
+
 import streamlit as st
 import pandas as pd
+from PIL import Image
+
+import catalog
+import dataset
+import export
+import exporter_index
+import profiling
+import query
+import ranking
+import search_ui
+import warmup
 
 # ✅ 인증 ID 목록
 ALLOWED_IDS = ['hansehyuk']
+# 🛠️ 성능 패널을 볼 수 있는 관리자 ID
+ADMIN_IDS = ['hansehyuk']
+
+# 📁 파일 경로 설정
+# (ingest.py 로 만든 월별 저장소가 있으면 저장소를 우선 사용)
+PREDEFINED_FILE_PATH = dataset.pick_source(dataset.STORE_DIR, "combined2.xlsx")
+
+# 🔥 로그인 화면이 떠 있는 동안 큐브/조건 목록/이름 색인/기본 검색 결과를 백그라운드에서 준비
+warmup.start(PREDEFINED_FILE_PATH)
+
+# 🖼️ 로그인 화면 이미지 표시 폭 (원본 PNG 는 한 번만 줄여서 캐시)
+LOGIN_IMAGE_WIDTH = 800
+
+@st.cache_resource
+def login_image(path="pepe.png", width=LOGIN_IMAGE_WIDTH):
+    with Image.open(path) as image:
+        image = image.convert('RGB')
+        image.thumbnail((width, width * image.height // image.width))
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=85, optimize=True)
+    return buffer.getvalue()
+
+# ⏳ 데이터 준비 상태 (준비 중이면 1초마다 갱신하는 조각, 끝났으면 한 번만 표시)
+def warmup_status():
+    state = warmup.status(PREDEFINED_FILE_PATH)
+    if state['finished']:
+        show_warmup(state)
+    else:
+        warmup_progress()
+
+# 준비가 끝나면 화면 전체를 한 번 다시 그려서 갱신 조각을 내림 (이후로는 갱신하지 않음)
+@st.fragment(run_every=1)
+def warmup_progress():
+    state = warmup.status(PREDEFINED_FILE_PATH)
+    if state['finished']:
+        st.rerun()
+    show_warmup(state)
+
+def show_warmup(state):
+    if state['error'] is not None:
+        st.caption(f"⚠️ 데이터 준비 중 오류 발생: {state['error']}")
+    elif state['finished']:
+        st.caption(f"✅ 데이터 준비 완료 ({state['elapsed']:.1f}초)")
+    else:
+        st.progress(state['done'] / state['total'], text=f"⏳ 데이터 준비 중: {state['step'] or '시작'}")
 
 # 🔐 사용자 인증
 if 'authorized' not in st.session_state:
@@ -14,61 +73,292 @@ if not st.session_state.authorized:
     if st.button("입장"):
         if user_id in ALLOWED_IDS:
             st.session_state.authorized = True
+            st.session_state.user_id = user_id
             st.rerun()  # ← 여기만 수정~
         else:
             st.warning("등록된 아이디가 아닙니다.")
 
+    warmup_status()
+
     # 👇 이미지 아래쪽에 추가 (중앙 정렬)
-    st.image("pepe.png", width=1600)
+    st.image(login_image(), width=LOGIN_IMAGE_WIDTH)
 
     st.stop()
 
  
 
-# 📁 파일 경로 설정
-PREDEFINED_FILE_PATH = "combined2.xlsx"
-
-# 📄 데이터 로드
-@st.cache_data
+# 📌 수출자 선택 후보 최대 개수
+EXPORTER_OPTION_LIMIT = 1000
+
+# 📊 현황 분석 표 (화면 순서) → 제목
+ANALYSIS_SECTIONS = {
+    'detail': "📦 수출자별 컨테이너 상세 현황",
+    'countries': "🌍 도착지국가별 총 컨테이너 수",
+    'country_carriers': "🧭 도착지국가별 컨테이너선사별 컨테이너 수 및 비중",
+}
+
+# 📥 내려받을 수 있는 표 → (검색 결과 이름, 순위 기준 컬럼)
+EXPORT_TABLES = {
+    '수출자별 순위': ('exporters', '수출자'),
+    '컨테이너선사별 순위': ('carriers', '컨테이너선사'),
+    '수출자 상세 현황': ('detail', None),
+}
+
+# 📈 기간 비교 기준 → 비교 결과 이름
+COMPARISON_GROUPS = {
+    '수출자': 'exporters',
+    '도착지국가별 수출자': 'country_exporters',
+    '컨테이너선사별 수출자': 'carrier_exporters',
+}
+
+# 📄 데이터 로드 (검색 조건 목록, 집계는 선택된 검색 백엔드가 계산)
 def load_data():
     try:
-        df = pd.read_excel(PREDEFINED_FILE_PATH, parse_dates=['선적일'])
-        return df
+        return catalog.shared_catalog(PREDEFINED_FILE_PATH)
     except Exception as e:
         st.error(f"파일 로드 중 오류 발생: {e}")
         return None
 
-# 🔍 조건 기반 필터링 함수
-def filter_data(df, start_date, end_date, loading_port, arrival_port, arrival_country, min_containers):
-    df = df[(df['선적일'] >= pd.to_datetime(start_date)) & (df['선적일'] <= pd.to_datetime(end_date))]
+# 🔍 조건 기반 필터링 함수 (검색 실행은 search_ui 공용 함수)
+def filter_data(start_date, end_date, loading_port, arrival_port, arrival_country, min_containers, outputs=('exporters', 'carriers')):
+    spec = query.make_spec(start_date, end_date, loading_port, arrival_country, arrival_port, min_containers)
+    return search_ui.run_search(PREDEFINED_FILE_PATH, spec, outputs)
+
+def is_admin():
+    return st.session_state.get('user_id') in ADMIN_IDS
+
+# cProfile 캡처는 관리자가 켠 다음 검색 한 번에만 적용
+def take_profile_capture():
+    if not is_admin() or not st.session_state.get('profile_capture'):
+        return False
+    st.session_state.profile_capture = False
+    return True
+
+# ⏱️ 관리자 전용 성능 패널: 최근 검색의 단계별 시간/행 수, cProfile 캡처
+def performance_panel():
+    if 'profiling_enabled' not in st.session_state:
+        st.session_state.profiling_enabled = profiling.enabled()
+    with st.sidebar.expander("⏱️ 성능"):
+        profiling.set_enabled(st.checkbox("단계별 계측 켜기", key='profiling_enabled'))
+        st.checkbox("cProfile 캡처 (다음 검색)", key='profile_capture')
+        if profiling.log_path():
+            st.caption(f"계측 기록 파일: {profiling.log_path()} (계측이 켜져 있을 때만 기록)")
+        stats = query.cache_stats()
+        st.caption(f"결과 캐시: 적중 {stats['hits']} / 실패 {stats['misses']} / {stats['entries']}개, {stats['bytes'] / 2 ** 20:.1f} MB")
+        queue = query.scheduler_stats()
+        st.caption(f"검색 스케줄러: 작업 {queue['workers']}개 / 진행 {queue['inflight']}건 / 대기 {queue['waiting']}건")
+        if st.button("기록 지우기"):
+            profiling.clear()
+
+    records = profiling.recent()
+    if not records:
+        return
+    st.markdown("---")
+    st.subheader("⏱️ 최근 검색 성능")
+    summary = pd.DataFrame([
+        {'시각': record['time'], '검색': record['name'], '전체(ms)': round(record['total_ms'], 1),
+         **{stage['name']: round(stage['ms'], 1) for stage in record['stages']}}
+        for record in records
+    ])
+    st.dataframe(summary)
+    latest = records[0]
+    st.write("#### 최근 검색 단계별 행 수", pd.DataFrame(latest['stages']))
+    if latest['profile']:
+        with st.expander("cProfile 결과"):
+            st.text(latest['profile'])
+
+# 📊 현황 분석 표 하나 완성 (집계 결과에 정렬/합계/비중 추가)
+def analysis_table(table, name):
+    if table.empty:
+        return table
+
+    if name == 'detail':
+        table = table.sort_values(by='컨테이너수', ascending=False).reset_index(drop=True)
+        total_sum = table['컨테이너수'].sum()
+        total_row = pd.DataFrame([{
+            '수출자': '총합계',
+            '선적항': '',
+            '도착지국가': '',
+            '도착항': '',
+            '컨테이너수': total_sum
+        }])
+        return pd.concat([table, total_row], ignore_index=True)
+
+    if name == 'countries':
+        # [1] 도착지국가별 컨테이너 수 합계
+        return table.sort_values(by='컨테이너수', ascending=False).reset_index(drop=True)
+
+    # [2] 도착지국가별 컨테이너선사별 컨테이너 수 및 비중
+    total_per_country = table.groupby('도착지국가', observed=True)['컨테이너수'].transform('sum')
+    table['비중(%)'] = (table['컨테이너수'] / total_per_country * 100).round(0).astype(int)
+    return table.sort_values(by=['도착지국가', '컨테이너수'], ascending=[True, False]).reset_index(drop=True)
+
+# 📦 현황 분석: 세 표를 검색 스케줄러에 한 번에 예약하고 끝나는 순서대로 자기 자리에 표시
+# 기다리는 동안 대기 순번을 갱신하고, 재실행으로 중단되면 예약을 놓아서 아무도 기다리지 않는 계산은 취소
+def show_analysis(spec):
+    st.markdown("---")
+    placeholders = {name: st.empty() for name in ANALYSIS_SECTIONS}
+    tickets = {}
+    try:
+        try:
+            for name in ANALYSIS_SECTIONS:
+                tickets[name] = query.submit_query(PREDEFINED_FILE_PATH, spec, [name], search_ui.session_id())
+        except query.QueueFullError as e:
+            for placeholder in placeholders.values():
+                placeholder.empty()
+            st.warning(str(e))
+            return
+
+        pending = dict(tickets)
+        with profiling.stage('queue_wait'):
+            while pending:
+                for name, ticket in list(pending.items()):
+                    if ticket.done():
+                        del pending[name]
+                        table = analysis_table(ticket.result()[name].copy(deep=False), name)
+                        show_analysis_table(placeholders[name], name, table)
+                        continue
+                    position = ticket.position()
+                    placeholders[name].caption(f"⏳ {ANALYSIS_SECTIONS[name]} 대기 중 (대기 순번 {position}번)" if position
+                                               else f"⌛ {ANALYSIS_SECTIONS[name]} 계산 중...")
+                if pending:
+                    wait([ticket.future for ticket in pending.values()], query.QUEUE_POLL_SECONDS, FIRST_COMPLETED)
+    finally:
+        for ticket in tickets.values():
+            ticket.release()
+
+def show_analysis_table(placeholder, name, table):
+    if table.empty:
+        # 조건이 같으므로 한 표가 비어 있으면 모두 비어 있음 → 상세 자리에만 안내
+        if name == 'detail':
+            placeholder.warning("선택한 수출자에 해당하는 데이터가 없습니다.")
+        else:
+            placeholder.empty()
+        return
+    with placeholder.container():
+        st.subheader(ANALYSIS_SECTIONS[name])
+        st.dataframe(table)
+
+# 📥 내보낼 표 계산 (내보내기 작업 스레드에서 실행, Streamlit 호출 없음)
+# 검색 스케줄러를 거치므로 요청한 세션의 대기 한도에 함께 셈
+# 전체 결과는 파일로 한 번 쓰고 버리므로 결과 캐시에 넣지 않음 (캐시 용량을 검색 결과에 남겨 둠)
+def export_table(spec, output, key, session):
+    table = query.scheduled_query(PREDEFINED_FILE_PATH, spec, [output], session, cache=False)[output]
+    if key is not None:
+        return ranking.top_ranked(table, key)
+    return table.sort_values(by='컨테이너수', ascending=False).reset_index(drop=True)
+
+# 📥 결과 내려받기: 현재 조건의 전체 결과를 백그라운드에서 CSV/엑셀로 청크 단위 저장 → 완료되면 내려받기 버튼
+# (수출자 상세 현황은 수출자를 선택했으면 현황 분석과 같은 조건으로 만듦)
+def export_panel():
+    with st.sidebar.expander("📥 결과 내려받기"):
+        table_name = st.selectbox("표 선택", list(EXPORT_TABLES), key='export_table')
+        fmt = st.radio("형식", list(export.FORMATS), horizontal=True, key='export_format')
+        if st.button("파일 만들기"):
+            output, key = EXPORT_TABLES[table_name]
+            if output == 'detail' and st.session_state.exporters:
+                spec = query.make_spec(st.session_state.start_date, st.session_state.end_date, exporters=st.session_state.exporters)
+            else:
+                spec = query.make_spec(
+                    st.session_state.start_date, st.session_state.end_date,
+                    st.session_state.loading_port, st.session_state.arrival_country, st.session_state.arrival_port,
+                    st.session_state.min_containers,
+                )
+            name = f"{table_name}_{spec.start_date:%Y%m%d}_{spec.end_date:%Y%m%d}".replace(' ', '_')
+            session = search_ui.session_id()
+            st.session_state.export_job = export.start(lambda: export_table(spec, output, key, session), name, fmt)
+        if st.session_state.get('export_job'):
+            export_status(st.session_state.export_job)
+
+# 진행 중이면 1초마다 갱신하는 조각, 끝났으면 결과만 한 번 표시
+def export_status(job_id):
+    job = export.status(job_id)
+    if job is None:
+        return
+    if job['finished']:
+        show_export(job_id, job)
+    else:
+        export_progress(job_id)
+
+# 완료되면 화면 전체를 한 번 다시 그려서 갱신 조각을 내림 (이후로는 갱신하지 않음)
+@st.fragment(run_every=1)
+def export_progress(job_id):
+    job = export.status(job_id)
+    if job is None or job['finished']:
+        st.rerun()
+    show_export(job_id, job)
+
+def show_export(job_id, job):
+    if job['error'] is not None:
+        st.error(f"파일 생성 중 오류 발생: {job['error']}")
+    elif job['finished']:
+        st.download_button(f"💾 {job['file_name']}", data=lambda: export.read(job_id), file_name=job['file_name'],
+                           mime=job['mime'], on_click='ignore')
+    elif job['total']:
+        st.progress(job['written'] / job['total'], text=f"⏳ {job['written']:,} / {job['total']:,}행 저장 중")
+    else:
+        st.caption("⏳ 결과를 계산 중입니다...")
+
+# 📈 기본 비교 기간: 현재 기간 바로 앞의 같은 길이 기간 (현재 기간과 겹치지 않음)
+def default_comparison_period(start_date, end_date):
+    start_date = pd.Timestamp(start_date)
+    previous_end = start_date - pd.Timedelta(days=1)
+    previous_start = previous_end - (pd.Timestamp(end_date) - start_date)
+    return previous_start.date(), previous_end.date()
+
+# 📈 기간 비교 결과 (증감 순 정렬 + 신규/이탈 수출자)
+def show_comparison():
+    group = COMPARISON_GROUPS[st.session_state.comparison_group]
+    spec = query.make_spec(
+        st.session_state.start_date, st.session_state.end_date,
+        st.session_state.loading_port, st.session_state.arrival_country, st.session_state.arrival_port,
+        st.session_state.min_containers,
+    )
+    try:
+        outputs = list(dict.fromkeys(['exporters', group]))
+        result = search_ui.run_comparison(PREDEFINED_FILE_PATH, spec, st.session_state.previous_start, st.session_state.previous_end, outputs)
+    except ValueError as e:
+        st.warning(str(e))
+        return
+    if result is None:
+        return
+
+    exporters = result['exporters']
+    if exporters.empty:
+        st.warning("조건에 맞는 데이터가 없습니다.")
+        return
 
-    if loading_port != 'All':
-        df = df[df['선적항'] == loading_port]
-    if arrival_country != 'All':
-        df = df[df['도착지국가'] == arrival_country]
-    if arrival_port != 'All':
-        df = df[df['도착항'] == arrival_port]
+    status = exporters[query.STATUS_COLUMN]
+    columns = st.columns(3)
+    columns[0].metric("총 증감", f"{int(exporters[query.DELTA_COLUMN].sum()):,}")
+    columns[1].metric("신규 수출자", f"{int((status == '신규').sum()):,}")
+    columns[2].metric("이탈 수출자", f"{int((status == '이탈').sum()):,}")
 
-    grouped = df.groupby('수출자').agg({'컨테이너수': 'sum'}).reset_index()
-    grouped = grouped[grouped['컨테이너수'] >= min_containers]
-    filtered_df = df[df['수출자'].isin(grouped['수출자'])]
+    table = result[group].sort_values(by=query.DELTA_COLUMN, ascending=False, kind='stable').reset_index(drop=True)
+    if st.session_state.rank_limit != 'All' and len(table) > st.session_state.rank_limit:
+        st.caption(f"증감 상위 {st.session_state.rank_limit}개 / 전체 {len(table)}개")
+        table = ranking.trim_categories(table.head(st.session_state.rank_limit))
+    st.write(f"### 📈 {st.session_state.comparison_group}별 기간 비교", table)
 
-    return filtered_df
+    for label in ['신규', '이탈']:
+        names = exporters.loc[status == label].sort_values(by=[query.CURRENT_COLUMN, query.PREVIOUS_COLUMN], ascending=False)
+        with st.expander(f"{label} 수출자 {len(names)}개"):
+            st.dataframe(ranking.trim_categories(names[['수출자', query.PREVIOUS_COLUMN, query.CURRENT_COLUMN]].reset_index(drop=True)))
 
 # 🧭 Streamlit 앱 UI
 def app():
     st.title("국내 컨테이너 수출 고객 탐색기")
     st.write("📊 데이터를 기반으로 고객을 탐색하고, 고객의 수출 컨테이너 현황을 분석합니다.")
 
-    df = load_data()
-    if df is None:
+    dim_catalog = load_data()
+    if dim_catalog is None:
         return
 
     st.sidebar.header("🚩 조건 기반 검색")
 
     # 날짜 필터
-    min_date = df['선적일'].min()
-    max_date = df['선적일'].max()
+    min_date = dim_catalog['min_date']
+    max_date = dim_catalog['max_date']
 
     # 초기 session_state 설정
     default_keys = {
@@ -78,6 +368,7 @@ def app():
         'arrival_country': 'All',
         'arrival_port': 'All',
         'min_containers': 0,
+        'rank_limit': ranking.RANK_LIMIT_OPTIONS[0],
         'exporters': []
     }
     for key, val in default_keys.items():
@@ -89,18 +380,17 @@ def app():
     st.session_state.end_date = st.sidebar.date_input("📅 종료일", min_value=min_date, max_value=max_date, value=st.session_state.end_date)
 
     # 선적항
-    loading_port_options = ['All'] + sorted(df['선적항'].dropna().astype(str).unique().tolist())
+    loading_port_options = ['All'] + catalog.options(dim_catalog, '선적항')
     loading_port_index = loading_port_options.index(st.session_state.loading_port) if st.session_state.loading_port in loading_port_options else 0
     st.session_state.loading_port = st.sidebar.selectbox("⚓ 선적항", loading_port_options, index=loading_port_index)
 
     # 도착지국가
-    arrival_country_options = ['All'] + sorted(df['도착지국가'].dropna().astype(str).unique().tolist())
+    arrival_country_options = ['All'] + catalog.options(dim_catalog, '도착지국가', '선적항', st.session_state.loading_port)
     arrival_country_index = arrival_country_options.index(st.session_state.arrival_country) if st.session_state.arrival_country in arrival_country_options else 0
     st.session_state.arrival_country = st.sidebar.selectbox("🌎 도착지국가", arrival_country_options, index=arrival_country_index)
 
     # 도착항
-    arrival_port_raw = df[df['도착지국가'] == st.session_state.arrival_country]['도착항'].dropna() if st.session_state.arrival_country != 'All' else df['도착항'].dropna()
-    arrival_port_options = ['All'] + sorted(arrival_port_raw.astype(str).unique().tolist())
+    arrival_port_options = ['All'] + catalog.options(dim_catalog, '도착항', '도착지국가', st.session_state.arrival_country)
     arrival_port_index = arrival_port_options.index(st.session_state.arrival_port) if st.session_state.arrival_port in arrival_port_options else 0
     st.session_state.arrival_port = st.sidebar.selectbox("⚓ 도착항", arrival_port_options, index=arrival_port_index)
 
@@ -109,11 +399,33 @@ def app():
     container_index = container_values.index(st.session_state.min_containers) if st.session_state.min_containers in container_values else 0
     st.session_state.min_containers = st.sidebar.selectbox("📦 최소 컨테이너 수", container_values, index=container_index)
 
+    # 표시할 순위 수 (상위 일부만 정렬)
+    rank_limit_index = ranking.RANK_LIMIT_OPTIONS.index(st.session_state.rank_limit) if st.session_state.rank_limit in ranking.RANK_LIMIT_OPTIONS else 0
+    st.session_state.rank_limit = st.sidebar.selectbox("🏅 표시할 순위 수", ranking.RANK_LIMIT_OPTIONS, index=rank_limit_index)
+
+    # 📈 기간 비교 (위 시작일~종료일이 현재 기간, 기본 비교 기간은 바로 앞의 같은 길이 기간)
+    compare_mode = st.sidebar.checkbox("📈 기간 비교", key='compare_mode')
+    if compare_mode:
+        # 사용자가 비교 기간을 직접 바꾸지 않았으면 현재 기간이 바뀔 때 기본 비교 기간도 따라감
+        default_period = default_comparison_period(st.session_state.start_date, st.session_state.end_date)
+        if 'previous_start' not in st.session_state or \
+                (st.session_state.previous_start, st.session_state.previous_end) == st.session_state.get('comparison_default'):
+            st.session_state.previous_start, st.session_state.previous_end = default_period
+        st.session_state.comparison_default = default_period
+        # 기본 비교 기간은 데이터 시작일보다 앞설 수 있음 (그 기간의 물량은 0)
+        compare_min = min(pd.Timestamp(min_date), pd.Timestamp(st.session_state.previous_start)).date()
+        st.sidebar.date_input("📅 비교 시작일", min_value=compare_min, max_value=max_date, key='previous_start')
+        st.sidebar.date_input("📅 비교 종료일", min_value=compare_min, max_value=max_date, key='previous_end')
+        st.sidebar.selectbox("🧮 비교 기준", list(COMPARISON_GROUPS), key='comparison_group')
+
     # ▶ 고객 검색
-    if st.sidebar.button("고객 검색"):
-        with st.spinner("⌛ 조건 기반 데이터를 조회 중입니다..."):
-            result_df = filter_data(
-                df,
+    search_clicked = st.sidebar.button("고객 검색")
+    if search_clicked and compare_mode:
+        with st.spinner("⌛ 두 기간을 비교하는 중입니다..."), profiling.trace("기간 비교", profile=take_profile_capture()):
+            show_comparison()
+    elif search_clicked:
+        with st.spinner("⌛ 조건 기반 데이터를 조회 중입니다..."), profiling.trace("고객 검색", profile=take_profile_capture()):
+            result = filter_data(
                 st.session_state.start_date,
                 st.session_state.end_date,
                 st.session_state.loading_port,
@@ -122,72 +434,49 @@ def app():
                 st.session_state.min_containers
             )
 
-            if not result_df.empty:
-                grouped = result_df.groupby('수출자').agg({'컨테이너수': 'sum'}).reset_index()
-                grouped = grouped.sort_values(by='컨테이너수', ascending=False)
-                grouped['순위'] = grouped['컨테이너수'].rank(ascending=False, method='min')
-                grouped = grouped[['순위', '수출자', '컨테이너수']].reset_index(drop=True)
-                st.write("### 🫅 수출자별 총 컨테이너 수", grouped)
-
-                port_grouped = result_df.groupby('컨테이너선사').agg({'컨테이너수': 'sum'}).reset_index()
-                port_grouped = port_grouped.sort_values(by='컨테이너수', ascending=False)
-                port_grouped['순위'] = port_grouped['컨테이너수'].rank(ascending=False, method='min')
-                port_grouped = port_grouped[['순위', '컨테이너선사', '컨테이너수']].reset_index(drop=True)
-                st.write("### 🚢 컨테이너선사별 총 컨테이너 수", port_grouped)
-            else:
+            if result is not None and not result['exporters'].empty:
+                with profiling.stage('rank', len(result['exporters']) + len(result['carriers'])) as stage:
+                    grouped = ranking.top_ranked(result['exporters'], '수출자', st.session_state.rank_limit)
+                    port_grouped = ranking.top_ranked(result['carriers'], '컨테이너선사', st.session_state.rank_limit)
+                    stage.rows_out = len(grouped) + len(port_grouped)
+
+                with profiling.stage('render', len(grouped) + len(port_grouped)):
+                    st.write("### 🫅 수출자별 총 컨테이너 수", grouped)
+                    if len(grouped) < len(result['exporters']):
+                        st.caption(f"상위 {len(grouped)}개 / 전체 {len(result['exporters'])}개 (표시할 순위 수를 늘리면 더 볼 수 있습니다)")
+                    st.write("### 🚢 컨테이너선사별 총 컨테이너 수", port_grouped)
+            elif result is not None:
                 st.warning("조건에 맞는 데이터가 없습니다.")
 
     # 🔍 수출자 복수 선택 및 분석
     st.sidebar.subheader("🔎 수출자 수출 현황")
 
-    all_exporters = sorted(df['수출자'].dropna().astype(str).unique().tolist())
-    st.session_state.exporters = st.sidebar.multiselect("📌 수출자 선택", all_exporters, default=st.session_state.exporters)
+    # 수출자 이름/초성으로 후보를 좁힌 뒤 선택 (전체 목록은 수출자가 적을 때만 표시)
+    index = exporter_index.shared_index(PREDEFINED_FILE_PATH)
+    exporter_query = st.sidebar.text_input("🔠 수출자 이름 검색 (초성 가능)")
+    if exporter_query.strip():
+        candidates = index.search_names(exporter_query, limit=EXPORTER_OPTION_LIMIT)
+    elif len(index.names) <= EXPORTER_OPTION_LIMIT:
+        candidates = index.names.tolist()
+    else:
+        candidates = []
+        st.sidebar.caption("수출자 이름을 입력하면 선택 후보가 표시됩니다.")
+    exporter_options = list(dict.fromkeys(st.session_state.exporters + candidates))
+    st.session_state.exporters = st.sidebar.multiselect("📌 수출자 선택", exporter_options, default=st.session_state.exporters)
 
     if st.sidebar.button("현황 분석"):
         if st.session_state.exporters:
-            with st.spinner("⌛ 수출자 데이터를 조회 중입니다..."):
-                date_filtered_df = df[(df['선적일'] >= pd.to_datetime(st.session_state.start_date)) &
-                                      (df['선적일'] <= pd.to_datetime(st.session_state.end_date))]
-                filtered = date_filtered_df[date_filtered_df['수출자'].isin(st.session_state.exporters)]
-
-                if not filtered.empty:
-                    grouped_exporter = filtered.groupby(['수출자', '선적항', '도착지국가', '도착항']).agg({'컨테이너수': 'sum'}).reset_index()
-                    grouped_exporter = grouped_exporter.sort_values(by='컨테이너수', ascending=False).reset_index(drop=True)
-
-                    total_sum = grouped_exporter['컨테이너수'].sum()
-                    total_row = pd.DataFrame([{
-                        '수출자': '총합계',
-                        '선적항': '',
-                        '도착지국가': '',
-                        '도착항': '',
-                        '컨테이너수': total_sum
-                    }])
-                    grouped_exporter = pd.concat([grouped_exporter, total_row], ignore_index=True)
-
-                    st.markdown("---")
-                    st.subheader("📦 수출자별 컨테이너 상세 현황")
-                    st.dataframe(grouped_exporter)
-
-                    # [1] 도착지국가별 컨테이너 수 합계
-                    arrival_country_sum = filtered.groupby('도착지국가').agg({'컨테이너수': 'sum'}).reset_index()
-                    arrival_country_sum = arrival_country_sum.sort_values(by='컨테이너수', ascending=False).reset_index(drop=True)
-
-                    st.subheader("🌍 도착지국가별 총 컨테이너 수")
-                    st.dataframe(arrival_country_sum)
-
-                    # [2] 도착지국가별 컨테이너선사별 컨테이너 수 및 비중
-                    grouped_by_country_line = filtered.groupby(['도착지국가', '컨테이너선사']).agg({'컨테이너수': 'sum'}).reset_index()
-                    total_per_country = grouped_by_country_line.groupby('도착지국가')['컨테이너수'].transform('sum')
-                    grouped_by_country_line['비중(%)'] = (grouped_by_country_line['컨테이너수'] / total_per_country * 100).round(0).astype(int)
-                    grouped_by_country_line = grouped_by_country_line.sort_values(by=['도착지국가', '컨테이너수'], ascending=[True, False]).reset_index(drop=True)
-
-                    st.subheader("🧭 도착지국가별 컨테이너선사별 컨테이너 수 및 비중")
-                    st.dataframe(grouped_by_country_line)
-                else:
-                    st.warning("선택한 수출자에 해당하는 데이터가 없습니다.")
+            with st.spinner("⌛ 수출자 데이터를 조회 중입니다..."), profiling.trace("현황 분석", profile=take_profile_capture()):
+                spec = query.make_spec(st.session_state.start_date, st.session_state.end_date, exporters=st.session_state.exporters)
+                show_analysis(spec)
         else:
             st.warning("수출자를 한 명 이상 선택해 주세요.")
 
+    export_panel()
+
+    if is_admin():
+        performance_panel()
+
 # 앱 실행
 if __name__ == "__main__":
     app()
@@ -0,0 +1,164 @@
+import argparse
+import itertools
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import catalog
+import dataset
+import query
+import ranking
+
+# 🧾 조건 파일 컬럼 (start_date, end_date 는 필수)
+SPEC_COLUMNS = ['name', 'start_date', 'end_date', 'loading_port', 'arrival_country', 'arrival_port', 'min_containers', 'outputs']
+DEFAULT_OUTPUTS = ['exporters', 'carriers']
+# 조건 값이 '*' 이면 해당 항목의 모든 선택지로 펼침
+EXPAND_ALL = '*'
+
+# 결과 표 → 순위 기준 컬럼 (나머지 결과는 그대로 저장)
+_RANKED_OUTPUTS = {'exporters': '수출자', 'carriers': '컨테이너선사', 'countries': '도착지국가'}
+
+
+def read_specs(path):
+    if path.endswith('.jsonl'):
+        with open(path, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f if line.strip()]
+    elif path.endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            records = json.load(f)
+    else:
+        records = pd.read_csv(path, dtype=str, keep_default_na=False).to_dict('records')
+
+    specs = [{key: value for key, value in record.items() if value not in ('', None)} for record in records]
+    for i, spec in enumerate(specs, start=1):
+        missing = {'start_date', 'end_date'} - set(spec)
+        if missing:
+            raise ValueError(f"{i}번째 조건에 필수 값이 없습니다: {', '.join(sorted(missing))}")
+    return specs
+
+
+# 🔁 '*' 조건을 카탈로그 선택지로 펼침 (선적항 → 도착지국가 → 도착항 순서로 연동)
+def expand_spec(row, dim_catalog):
+    loading_ports = [row.get('loading_port', 'All')]
+    if loading_ports == [EXPAND_ALL]:
+        loading_ports = catalog.options(dim_catalog, '선적항')
+
+    expanded = []
+    for loading_port in loading_ports:
+        countries = [row.get('arrival_country', 'All')]
+        if countries == [EXPAND_ALL]:
+            countries = catalog.options(dim_catalog, '도착지국가', '선적항', loading_port)
+        for country in countries:
+            ports = [row.get('arrival_port', 'All')]
+            if ports == [EXPAND_ALL]:
+                ports = catalog.options(dim_catalog, '도착항', '도착지국가', country)
+            for port in ports:
+                expanded.append({**row, 'loading_port': loading_port, 'arrival_country': country, 'arrival_port': port})
+
+    # 이름을 지정한 조건이 여러 개로 펼쳐지면 펼친 값을 이름 뒤에 붙여 구분
+    if 'name' in row and len(expanded) > 1:
+        for item in expanded:
+            item['name'] = '_'.join([row['name'], item['loading_port'], item['arrival_country'], item['arrival_port']])
+    return expanded
+
+
+def _file_name(text):
+    return re.sub(r'[\\/:*?"<>|\s]+', '_', str(text)).strip('_')
+
+
+def spec_name(row, spec):
+    if 'name' in row:
+        return _file_name(row['name'])
+    parts = [spec.loading_port, spec.arrival_country, spec.arrival_port,
+             spec.start_date.strftime('%Y%m%d'), spec.end_date.strftime('%Y%m%d'), f"min{spec.min_containers}"]
+    return _file_name('_'.join(str(part) for part in parts))
+
+
+def _outputs(row):
+    outputs = row.get('outputs', DEFAULT_OUTPUTS)
+    if isinstance(outputs, str):
+        outputs = [name.strip() for name in outputs.split('|') if name.strip()]
+    unknown = [name for name in outputs if name not in query.OUTPUTS]
+    if unknown:
+        raise ValueError(f"알 수 없는 결과 이름: {', '.join(unknown)}")
+    return outputs
+
+
+def write_table(table, target, fmt):
+    if fmt == 'parquet':
+        table.to_parquet(f"{target}.parquet", index=False)
+    else:
+        # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+        table.to_csv(f"{target}.csv", index=False, encoding='utf-8-sig')
+
+
+# ⚙️ 작업 프로세스: 조건 하나를 계산해서 결과 파일을 바로 씀 (부모에는 행 수만 반환)
+def run_spec(path, name, spec, outputs, out_dir, fmt, backend=None):
+    results = query.get_backend(path, backend).run_query(spec, outputs)
+    counts = {}
+    for output in outputs:
+        table = results[output]
+        if output in _RANKED_OUTPUTS:
+            table = ranking.top_ranked(table, _RANKED_OUTPUTS[output])
+        write_table(table, os.path.join(out_dir, f"{name}_{output}"), fmt)
+        counts[output] = len(table)
+    return name, counts
+
+
+def _init_worker(path, backend):
+    # pandas: fork 환경에서는 부모가 올린 큐브를 그대로 공유, spawn 환경에서는 스냅샷을 mmap 으로 읽음
+    # duckdb: 데이터베이스 파일을 (없으면 만들고) 열어 봄
+    query.get_backend(path, backend).load()
+
+
+def run_batch(path, spec_path, out_dir, fmt='csv', workers=None, backend=None):
+    dim_catalog = catalog.shared_catalog(path, query.get_backend(path, backend))
+    rows = list(itertools.chain.from_iterable(expand_spec(row, dim_catalog) for row in read_specs(spec_path)))
+
+    jobs = []
+    seen = set()
+    for row in rows:
+        spec = query.make_spec(
+            row['start_date'], row['end_date'],
+            row.get('loading_port', 'All'), row.get('arrival_country', 'All'), row.get('arrival_port', 'All'),
+            row.get('min_containers', 0),
+        )
+        name = spec_name(row, spec)
+        if name in seen:
+            raise ValueError(f"결과 이름이 중복됩니다: {name}")
+        seen.add(name)
+        jobs.append((name, spec, _outputs(row)))
+
+    os.makedirs(out_dir, exist_ok=True)
+    if workers == 1 or len(jobs) <= 1:
+        return [run_spec(path, name, spec, outputs, out_dir, fmt, backend) for name, spec, outputs in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(path, backend)) as pool:
+        futures = [pool.submit(run_spec, path, name, spec, outputs, out_dir, fmt, backend) for name, spec, outputs in jobs]
+        return [future.result() for future in as_completed(futures)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="조건 파일의 검색 조건을 한 번에 계산해서 결과 파일로 저장합니다.")
+    parser.add_argument('specs', help="조건 파일 (.csv / .jsonl), 컬럼: " + ', '.join(SPEC_COLUMNS))
+    parser.add_argument('--data', default=dataset.pick_source(dataset.STORE_DIR, 'combined2.xlsx'),
+                        help="데이터 원본 (엑셀 파일 또는 월별 저장소 폴더)")
+    parser.add_argument('--out', default='reports', help="결과 폴더 (기본값: reports)")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv', help="결과 파일 형식")
+    parser.add_argument('--workers', type=int, help="동시에 처리할 프로세스 수 (기본값: CPU 코어 수)")
+    parser.add_argument('--backend', choices=list(query.BACKENDS),
+                        help=f"검색 백엔드 (기본값: 환경 변수 {query.BACKEND_ENV} 또는 {query.DEFAULT_BACKEND})")
+    args = parser.parse_args(argv)
+
+    results = run_batch(args.data, args.specs, args.out, args.format, args.workers, args.backend)
+    for name, counts in sorted(results):
+        summary = ', '.join(f"{output} {count}행" for output, count in counts.items())
+        print(f"✅ {name}: {summary}")
+    print(f"📁 {len(results)}개 조건 결과를 {args.out} 에 저장했습니다.")
+
+
+if __name__ == "__main__":
+    main()
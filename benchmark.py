@@ -0,0 +1,156 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # Windows 에는 resource 모듈이 없음 → 프로세스 최대 RSS 생략
+    resource = None
+
+import catalog
+import dataset
+import exporter_index
+import query
+import ranking
+import synthetic_data
+
+# 📊 기준 대비 허용 지연 비율 (0.2 = 20% 까지 느려져도 통과)
+DEFAULT_TOLERANCE = 0.2
+
+
+def _measure(func, repeat):
+    # 시간: tracemalloc 없이 repeat 번 중 최솟값 / 메모리: 한 번 더 실행하며 최대 할당량 측정
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, {'seconds': best, 'peak_bytes': peak}
+
+
+def _stage(stages, name, func, repeat):
+    result, stats = _measure(func, repeat)
+    stages[name] = stats
+    print(f"  {name:<24} {stats['seconds'] * 1000:>10.1f} ms  {stats['peak_bytes'] / 2 ** 20:>9.1f} MB", flush=True)
+    return result
+
+
+# ⏱️ 한 크기에 대해 로드 → 사이드바 → 검색 → 순위 → 수출자 분석 단계별 시간/메모리 측정
+def run_size(rows, repeat=3, excel=True, seed=0):
+    stages = {}
+    df = synthetic_data.generate(rows, seed)
+    print(f"▶ {rows:,}행", flush=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if excel and rows <= synthetic_data.EXCEL_MAX_ROWS:
+            path = os.path.join(tmp, 'synthetic.xlsx')
+            synthetic_data.write_excel(df, path)
+            _stage(stages, 'load_excel', lambda: dataset.read_workbook(path), 1)
+            dataset.load_frame(path)
+            _stage(stages, 'load_snapshot', lambda: dataset.load_frame(path), repeat)
+
+        cube = _stage(stages, 'build_cube', lambda: dataset.build_cube(df), 1)
+        dim_catalog = _stage(stages, 'build_catalog', lambda: catalog.build_catalog(cube), 1)
+        country = dim_catalog['options']['도착지국가'][0]
+        _stage(stages, 'sidebar_options', lambda: (
+            catalog.options(dim_catalog, '선적항'),
+            catalog.options(dim_catalog, '도착지국가', '선적항', 'All'),
+            catalog.options(dim_catalog, '도착항', '도착지국가', country),
+        ), repeat)
+
+        last_day = dim_catalog['max_date']
+        specs = {
+            'filter_month': query.make_spec(last_day.replace(day=1), last_day),
+            'filter_full': query.make_spec(dim_catalog['min_date'], last_day, min_containers=100),
+            'filter_country': query.make_spec(dim_catalog['min_date'], last_day, arrival_country=country, min_containers=10),
+        }
+        results = None
+        for name, spec in specs.items():
+            results = _stage(stages, name, lambda spec=spec: query.run_query(cube, spec, ['exporters', 'carriers']), repeat)
+
+        exporters = results['exporters']
+        _stage(stages, 'rank_top100', lambda: ranking.top_ranked(exporters, '수출자', 100), repeat)
+        _stage(stages, 'rank_all', lambda: ranking.top_ranked(exporters, '수출자'), repeat)
+
+        top = ranking.top_ranked(exporters, '수출자', 5)['수출자'].astype(str).tolist()
+        analysis_spec = query.make_spec(dim_catalog['min_date'], last_day, exporters=top)
+        _stage(stages, 'exporter_analysis', lambda: query.run_query(cube, analysis_spec, ['detail', 'countries', 'country_carriers']), repeat)
+
+        index = _stage(stages, 'build_exporter_index', lambda: exporter_index.build_index(cube), 1)
+        _stage(stages, 'exporter_search', lambda: index.rows(cube, index.search('상사00'), dim_catalog['min_date'], last_day), repeat)
+
+    return {'rows': rows, 'stages': stages, 'max_rss_bytes': max_rss_bytes()}
+
+
+def max_rss_bytes():
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 는 바이트, Linux 는 KB 단위
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+
+# 📉 기준 결과와 비교: 허용 비율보다 느려진 단계 목록 반환
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    regressions = []
+    for size, result in results.items():
+        base = baseline.get(size)
+        if base is None:
+            continue
+        print(f"▶ {size} 기준 대비")
+        for name, stats in result['stages'].items():
+            before = base['stages'].get(name)
+            if not before or not before['seconds']:
+                continue
+            ratio = stats['seconds'] / before['seconds']
+            flag = '❌' if ratio > 1 + tolerance else '✅'
+            print(f"  {flag} {name:<24} {ratio:>6.2f}x")
+            if ratio > 1 + tolerance:
+                regressions.append((size, name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="합성 데이터로 로드/검색/순위 단계별 성능을 측정합니다.")
+    parser.add_argument('sizes', nargs='*', default=['100k'], help=f"측정할 크기 ({' / '.join(synthetic_data.SIZES)} 또는 숫자)")
+    parser.add_argument('--repeat', type=int, default=3, help="단계별 반복 횟수 (최솟값 기록)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-excel', action='store_true', help="엑셀 로드 단계 생략")
+    parser.add_argument('--save', help="결과를 JSON 으로 저장 (기준값으로 사용)")
+    parser.add_argument('--baseline', help="비교할 기준 JSON")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="허용 지연 비율")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for size in args.sizes:
+        results[size] = run_size(synthetic_data.parse_size(size), args.repeat, not args.no_excel, args.seed)
+        if results[size]['max_rss_bytes']:
+            print(f"  최대 RSS {results[size]['max_rss_bytes'] / 2 ** 20:.1f} MB")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"❌ 성능 저하 {len(regressions)}건")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
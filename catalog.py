@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+import dataset
+
+# 🔗 사이드바 연동 필터: (상위 컬럼, 하위 컬럼) → 양방향 인접 목록을 만듦
+CATALOG_LINKS = [('도착지국가', '도착항'), ('선적항', '도착지국가')]
+
+
+def _pairs(df, parent, child):
+    parent_codes = df[parent].cat.codes.to_numpy().astype(np.int64)
+    child_codes = df[child].cat.codes.to_numpy().astype(np.int64)
+    valid = (parent_codes >= 0) & (child_codes >= 0)
+    parent_names = df[parent].cat.categories.astype(str)
+    child_names = df[child].cat.categories.astype(str)
+
+    # 고유 (상위, 하위) 코드 쌍만 남긴 뒤 이름 쌍으로 변환
+    pairs = np.unique(parent_codes[valid] * len(child_names) + child_codes[valid])
+    return [(parent_names[parent_code], child_names[child_code])
+            for parent_code, child_code in zip(pairs // len(child_names), pairs % len(child_names))]
+
+
+def _adjacency(pairs):
+    links = {}
+    for parent, child in pairs:
+        links.setdefault(parent, []).append(child)
+    return {key: sorted(values) for key, values in links.items()}
+
+
+# 📚 사이드바 선택지 목록: 날짜 범위 + 컬럼별 고유 값 + CATALOG_LINKS 의 고유 (상위, 하위) 이름 쌍 → 양방향 인접 목록
+# (검색 백엔드마다 고유 값만 조회해서 넘김)
+def make_catalog(min_date, max_date, options, pairs):
+    catalog = {
+        'min_date': pd.Timestamp(min_date) if min_date is not None else pd.NaT,
+        'max_date': pd.Timestamp(max_date) if max_date is not None else pd.NaT,
+        'options': {col: sorted(values) for col, values in options.items()},
+        'links': {},
+    }
+    for (parent, child), values in pairs.items():
+        catalog['links'][(parent, child)] = _adjacency(values)
+        catalog['links'][(child, parent)] = _adjacency((c, p) for p, c in values)
+    return catalog
+
+
+# pandas 큐브에서 카테고리 코드로 계산
+def build_catalog(df):
+    dates = df[dataset.DATE_COLUMN].dropna()
+    options = {}
+    for col in dataset.DIMENSION_COLUMNS:
+        if col in df.columns:
+            codes = df[col].cat.codes.to_numpy()
+            used = np.unique(codes[codes >= 0])
+            options[col] = df[col].cat.categories[used].astype(str)
+    pairs = {(parent, child): _pairs(df, parent, child) for parent, child in CATALOG_LINKS
+             if parent in df.columns and child in df.columns}
+    return make_catalog(dates.min(), dates.max(), options, pairs)
+
+
+# 🗂️ 데이터셋 버전별로 한 번만 만들어 모든 세션이 공유 (선택된 검색 백엔드가 만듦)
+def shared_catalog(path, backend=None):
+    # query 가 이 모듈의 build_catalog 를 쓰므로 호출할 때 불러옴
+    import query
+    return (backend or query.get_backend(path)).catalog()
+
+
+# 선택지 목록: 상위 필터가 'All' 이면 전체, 아니면 상위 값과 함께 나온 값만
+def options(catalog, col, parent=None, parent_value='All'):
+    if parent is None or parent_value == 'All':
+        return catalog['options'].get(col, [])
+    return catalog['links'].get((parent, col), {}).get(parent_value, [])
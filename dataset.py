@@ -0,0 +1,371 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from pandas.api.types import union_categoricals
+
+import entity_resolution
+import xlsx_reader
+
+# 📁 스냅샷 저장 위치 (원본 엑셀 옆 .snapshot 폴더)
+SNAPSHOT_DIR = '.snapshot'
+# 스키마가 바뀌면 올려서 기존 스냅샷을 무효화
+SNAPSHOT_FORMAT = 5
+
+# 📋 공통 컬럼 정의
+DATE_COLUMN = '선적일'
+COUNT_COLUMN = '컨테이너수'
+DIMENSION_COLUMNS = ['선적항', '도착지국가', '도착항', '수출자', '컨테이너선사']
+EXPORTER_COLUMN = '수출자'
+# 1970-01-01 기준 일 번호 (날짜 비교를 정수 비교로 처리)
+DAY_COLUMN = '선적일번호'
+MISSING_DAY = np.iinfo(np.int32).min
+
+_VERSION_KEY = b'source_version'
+# 공용 프레임에 붙는 (원본 경로, 버전) 표시 → 결과 캐시 키로 사용
+VERSION_ATTR = 'dataset_version'
+
+
+# 🗃️ 월별 파티션 저장소 (ingest.py 로 적재): <저장소>/month=YYYYMM/{rows,cube}.arrow + manifest.json
+STORE_DIR = 'store'
+MANIFEST_NAME = 'manifest.json'
+# 적재 시점에 계산한 수출자 별칭 → 대표 이름 매핑
+ALIASES_NAME = 'aliases.json'
+
+
+def is_store(path):
+    return os.path.isdir(path)
+
+
+def partition_dir(store, month):
+    return os.path.join(store, f"month={month}")
+
+
+def read_manifest(store):
+    try:
+        with open(os.path.join(store, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'months': {}}
+
+
+# 📁 저장소가 만들어져 있으면 저장소를, 아니면 엑셀 원본을 사용
+def pick_source(store, fallback):
+    return store if os.path.exists(os.path.join(store, MANIFEST_NAME)) else fallback
+
+
+# 🔖 원본 파일 버전 (스냅샷 포맷 + 수정시각 + 크기, 저장소는 manifest.json 기준)
+# 엑셀 원본은 수출자 이름 정리 규칙/수동 별칭 파일이 바뀌어도 버전이 바뀜 (aliases=False 면 원본 파일만)
+def source_version(path, aliases=True):
+    if is_store(path):
+        path = os.path.join(path, MANIFEST_NAME)
+        aliases = False
+    stat = os.stat(path)
+    version = f"v{SNAPSHOT_FORMAT}-{stat.st_mtime_ns}-{stat.st_size}"
+    if aliases:
+        overrides = overrides_path(path)
+        overrides_mtime = os.stat(overrides).st_mtime_ns if os.path.exists(overrides) else 0
+        version += f"-er{entity_resolution.RESOLUTION_VERSION}-{overrides_mtime}"
+    return version
+
+
+def overrides_path(path):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), entity_resolution.OVERRIDES_NAME)
+
+
+def snapshot_path(path, kind=None):
+    directory = os.path.join(os.path.dirname(os.path.abspath(path)), SNAPSHOT_DIR)
+    name = os.path.splitext(os.path.basename(path))[0]
+    if kind:
+        name = f"{name}.{kind}"
+    return os.path.join(directory, f"{name}.arrow")
+
+
+_EPOCH = pd.Timestamp('1970-01-01')
+
+
+def to_day_numbers(values):
+    dates = pd.to_datetime(pd.Series(values), errors='coerce')
+    days = (dates - _EPOCH).dt.days
+    return days.fillna(MISSING_DAY).astype(np.int32).to_numpy()
+
+
+def day_number(value):
+    return (pd.Timestamp(value).normalize() - _EPOCH).days
+
+
+def _downcast_counts(counts):
+    counts = pd.to_numeric(counts, errors='coerce').fillna(0)
+    if (counts % 1 == 0).all():
+        return pd.to_numeric(counts.astype(np.int64), downcast='integer')
+    # 소수가 있는 컨테이너수는 float64 그대로 (float32 로 줄이면 합계에 반올림 오차가 생김)
+    return counts.astype(np.float64)
+
+
+# 🧹 엑셀 원본을 공통 스키마로 정리
+# - 차원 컬럼: 카테고리(사전 인코딩) → 필터/그룹화가 정수 코드로 처리됨
+# - 컨테이너수: 값 범위에 맞는 가장 작은 정수 타입 (소수가 있으면 float64)
+# - 선적일번호: int32 일 번호, 행은 선적일 순으로 정렬
+def normalize_frame(df):
+    df = df.copy()
+    if DATE_COLUMN in df.columns:
+        df[DATE_COLUMN] = pd.to_datetime(df[DATE_COLUMN], errors='coerce')
+        df[DAY_COLUMN] = to_day_numbers(df[DATE_COLUMN])
+    if COUNT_COLUMN in df.columns:
+        df[COUNT_COLUMN] = _downcast_counts(df[COUNT_COLUMN])
+    for col in DIMENSION_COLUMNS:
+        if col in df.columns:
+            # 숫자/문자 혼재 컬럼도 하나의 사전으로 묶이도록 문자열로 통일
+            values = df[col].where(df[col].isna(), df[col].astype(str)).astype(object)
+            df[col] = pd.Categorical(values)
+    if DAY_COLUMN in df.columns:
+        df = df.sort_values(DAY_COLUMN, kind='stable').reset_index(drop=True)
+    return df
+
+
+def read_snapshot(target, version):
+    if not os.path.exists(target):
+        return None
+    try:
+        table = feather.read_table(target, memory_map=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
+    metadata = table.schema.metadata or {}
+    if metadata.get(_VERSION_KEY, b'').decode() != version:
+        return None
+    # split_blocks: 컬럼별 블록 유지 (통합 복사 방지), 결측 없는 숫자 컬럼은 mmap 버퍼를 그대로 사용
+    return table.to_pandas(split_blocks=True)
+
+
+# 스냅샷 파일의 원본 버전 (스키마만 읽음, 없거나 깨졌으면 None)
+def snapshot_version(target):
+    try:
+        with pa.memory_map(target) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return metadata.get(_VERSION_KEY, b'').decode()
+
+
+def write_snapshot(target, version, df):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), _VERSION_KEY: version.encode()})
+    # 임시 파일에 쓴 뒤 교체해서 다른 프로세스가 깨진 스냅샷을 읽지 않도록 함
+    tmp = f"{target}.{os.getpid()}.tmp"
+    feather.write_feather(table, tmp, compression='uncompressed')
+    os.replace(tmp, target)
+
+
+def _save_snapshot(target, version, df):
+    try:
+        write_snapshot(target, version, df)
+    except OSError:
+        # 스냅샷 저장 실패는 치명적이지 않음 (다음 로드 때 다시 시도)
+        pass
+
+
+# 🧩 파티션별 프레임 합치기: 카테고리 사전을 합집합으로 맞춰 이어 붙이고 선적일 순으로 정렬
+# (차원 컬럼은 union_categoricals 로 바로 합쳐서 청크별 재인코딩 복사본을 만들지 않음)
+def concat_frames(frames):
+    if not frames:
+        return pd.DataFrame()
+    columns = list(dict.fromkeys(col for frame in frames for col in frame.columns))
+    dimensions = [col for col in DIMENSION_COLUMNS if all(col in frame.columns for frame in frames)]
+    others = [col for col in columns if col not in dimensions]
+    df = pd.concat([frame[[col for col in others if col in frame.columns]] for frame in frames], ignore_index=True)
+    for col in dimensions:
+        merged = union_categoricals([frame[col] for frame in frames], sort_categories=True)
+        # 사전 값 타입은 문자열로 추론되게 다시 만듦 (코드는 그대로 사용)
+        df[col] = pd.Categorical.from_codes(merged.codes, pd.Index(merged.categories.tolist()))
+    df = df[columns]
+    if COUNT_COLUMN in df.columns:
+        df[COUNT_COLUMN] = pd.to_numeric(df[COUNT_COLUMN], downcast='integer')
+    if DAY_COLUMN in df.columns:
+        days = df[DAY_COLUMN].to_numpy()
+        # 이미 선적일 순이면 (월별 파티션 등) 정렬 생략, 아니면 컬럼 하나씩 재배열 (추가 메모리는 컬럼 하나 분량)
+        if len(days) > 1 and (days[1:] < days[:-1]).any():
+            order = np.argsort(days, kind='stable')
+            for col in df.columns:
+                df[col] = df[col].array.take(order)
+    return df
+
+
+# 📖 엑셀 원본 읽기: 청크 단위로 스트리밍하면서 청크마다 공통 스키마로 변환한 뒤 합침
+def read_workbook(path):
+    return concat_frames([normalize_frame(chunk) for chunk in xlsx_reader.iter_chunks(path)])
+
+
+# 🔗 수출자 별칭 정리: 프레임들의 수출자별 컨테이너수 합계를 가중치로 별칭 → 대표 이름 매핑 계산
+def resolve_exporters(frames, overrides=None):
+    weights = {}
+    for frame in frames:
+        if EXPORTER_COLUMN not in frame.columns:
+            continue
+        totals = frame.groupby(EXPORTER_COLUMN, observed=True)[COUNT_COLUMN].sum()
+        for name, total in totals.items():
+            weights[name] = weights.get(name, 0) + int(total)
+    return entity_resolution.resolve(weights, weights, overrides)
+
+
+# 수출자 컬럼을 대표 이름으로 바꿔서 모든 그룹화가 같은 수출자로 묶이도록 함
+def apply_aliases(df, mapping):
+    if not mapping or EXPORTER_COLUMN not in df.columns:
+        return df
+    df = df.copy()
+    df[EXPORTER_COLUMN] = entity_resolution.canonicalize(df[EXPORTER_COLUMN], mapping)
+    return df
+
+
+def read_aliases(store):
+    try:
+        with open(os.path.join(store, ALIASES_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+# 엑셀 원본에 적용한 별칭 매핑 (수출자 이름 색인이 별칭으로도 찾도록 스냅샷 옆에 저장)
+def aliases_path(path):
+    return os.path.splitext(snapshot_path(path, 'aliases'))[0] + '.json'
+
+
+def _save_aliases(path, version, mapping):
+    target = aliases_path(path)
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': version, 'aliases': mapping}, f, ensure_ascii=False)
+        os.replace(tmp, target)
+    except OSError:
+        pass
+
+
+# 🔗 데이터셋에 적용된 별칭 → 대표 이름 매핑 (저장소: aliases.json / 엑셀: 최신 스냅샷의 매핑, 없으면 빈 매핑)
+def exporter_aliases(path):
+    if is_store(path):
+        return read_aliases(path)
+    try:
+        with open(aliases_path(path), encoding='utf-8') as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return saved['aliases'] if saved.get('version') == source_version(path) else {}
+
+
+def _load_store(store, kind):
+    months = sorted(read_manifest(store)['months'])
+    frames = [feather.read_table(os.path.join(partition_dir(store, month), f"{kind}.arrow")).to_pandas() for month in months]
+    df = concat_frames(frames)
+    mapping = read_aliases(store)
+    if not mapping or df.empty:
+        return df
+    df = apply_aliases(df, mapping)
+    # 파티션 큐브는 별칭별로 집계되어 있으므로 대표 이름 기준으로 다시 합침
+    return build_cube(df.drop(columns=[DATE_COLUMN])) if kind == 'cube' else df
+
+
+# 📄 데이터 로드 (스냅샷이 최신이면 엑셀 파싱 생략)
+def load_frame(path):
+    if is_store(path):
+        # 저장소의 파티션이 이미 Arrow 이므로 별도 스냅샷 없이 바로 합침
+        return _load_store(path, 'rows')
+
+    version = source_version(path)
+    target = snapshot_path(path)
+    df = read_snapshot(target, version)
+    if df is not None:
+        return df
+
+    df = read_workbook(path)
+    mapping = resolve_exporters([df], entity_resolution.read_overrides(overrides_path(path)))
+    df = apply_aliases(df, mapping)
+    # 매핑을 스냅샷보다 먼저 저장 (스냅샷이 최신이면 매핑도 최신)
+    _save_aliases(path, version, mapping)
+    _save_snapshot(target, version, df)
+    return df
+
+
+# 🧊 일별 집계 큐브: (선적일, 선적항, 도착지국가, 도착항, 수출자, 컨테이너선사) 별 컨테이너수 합계
+# 원본 B/L 행과 같은 컬럼 이름을 유지해서 필터/그룹화 코드를 그대로 사용할 수 있음
+def build_cube(df):
+    keys = [DAY_COLUMN] + [col for col in DIMENSION_COLUMNS if col in df.columns]
+    cube = df.groupby(keys, observed=True, dropna=False, sort=True).agg({COUNT_COLUMN: 'sum'}).reset_index()
+    cube[COUNT_COLUMN] = pd.to_numeric(cube[COUNT_COLUMN], downcast='integer')
+
+    days = cube[DAY_COLUMN].to_numpy()
+    dates = pd.to_datetime(days.astype('int64'), unit='D')
+    cube.insert(0, DATE_COLUMN, dates.where(days != MISSING_DAY))
+    return cube
+
+
+# 📅 선적일 범위 조회: 선적일 순으로 정렬된 프레임에서 이진 탐색으로 연속 구간을 잘라냄
+# (전체 행에 대한 비교 마스크 없이 O(log n) + 결과 크기)
+def date_bounds(df, start_date, end_date):
+    days = df[DAY_COLUMN].to_numpy()
+    lo = np.searchsorted(days, day_number(start_date), side='left')
+    hi = np.searchsorted(days, day_number(end_date), side='right')
+    return lo, hi
+
+
+def date_slice(df, start_date, end_date):
+    lo, hi = date_bounds(df, start_date, end_date)
+    return df.iloc[lo:hi]
+
+
+def load_cube(path):
+    version = source_version(path)
+    target = snapshot_path(path, 'cube')
+    cube = read_snapshot(target, version)
+    if cube is not None:
+        return cube
+
+    # 저장소는 파티션별로 미리 만든 큐브를 합치기만 함
+    cube = _load_store(path, 'cube') if is_store(path) else build_cube(load_frame(path))
+    _save_snapshot(target, version, cube)
+    return cube
+
+
+# 🗂️ 프로세스 공용 데이터셋 (모든 세션이 같은 프레임/인덱스를 공유)
+_shared = {}
+# 인덱스 빌더가 큐브를 다시 요청할 수 있으므로 재진입 가능한 락 사용
+_shared_lock = threading.RLock()
+
+
+def _freeze(df):
+    # 공유 프레임이 한 세션에서 수정되지 않도록 읽기 전용으로 표시
+    for col in df.columns:
+        values = df[col].values
+        if hasattr(values, 'flags'):
+            values.flags.writeable = False
+    return df
+
+
+# 원본 버전이 바뀌면 loader(path) 로 다시 만들어 교체
+def shared(path, kind, loader):
+    key = (os.path.abspath(path), kind)
+    version = source_version(path)
+    entry = _shared.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    with _shared_lock:
+        # 대기하는 동안 다른 세션이 이미 로드했을 수 있음
+        entry = _shared.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        value = loader(path)
+        if isinstance(value, pd.DataFrame):
+            value = _freeze(value)
+            value.attrs[VERSION_ATTR] = (key[0], version)
+        _shared[key] = (version, value)
+        return value
+
+
+def shared_cube(path):
+    return shared(path, 'cube', load_cube)
@@ -0,0 +1,170 @@
+import csv
+import os
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# 🏷️ 수출자 이름 정리 규칙이 바뀌면 올려서 기존 결과를 무효화
+RESOLUTION_VERSION = 2
+# ✍️ 수동 별칭 파일 (alias,canonical 두 컬럼, 자동 판정보다 우선) → 원본 옆에 두면 적용
+# canonical 이 alias 와 같으면 '따로 유지': 그 이름은 자동 병합에서 빠짐 (잘못 묶인 회사 분리용)
+OVERRIDES_NAME = 'exporter_aliases.csv'
+
+# 🔗 같은 블록 안에서 이 값 이상이면 같은 수출자로 판정 (글자 2-gram Dice 계수)
+SIMILARITY_THRESHOLD = 0.88
+# 블록 키: 정규화 이름 앞 글자 수 / 토큰 최소 길이
+PREFIX_LENGTH = 4
+MIN_TOKEN_LENGTH = 3
+# 이보다 큰 블록은 전체 쌍 대신 정렬 후 앞뒤 WINDOW 개만 비교 (정렬 이웃 방식)
+MAX_BLOCK = 64
+WINDOW = 8
+
+# 법인 형태 표기 (한글은 위치와 무관하게, 영문은 끝에 붙은 토큰만 제거)
+_KOREAN_SUFFIXES = ['주식회사', '유한책임회사', '유한회사', '합자회사', '합명회사', '(주)', '(유)', '(합)']
+_LATIN_SUFFIXES = {
+    'CO', 'COMPANY', 'CORP', 'CORPORATION', 'INC', 'INCORPORATED', 'LTD', 'LIMITED', 'LLC', 'PLC',
+    'GMBH', 'AG', 'PTE', 'PVT', 'SA', 'SAS', 'SRL', 'BV', 'NV', 'JSC', 'KK',
+}
+_PUNCTUATION = re.compile(r"[^\w]+")
+_DIGITS = re.compile(r"\d+")
+
+
+# 🧹 비교용 이름: 전각/반각 통일 + 대문자 + 법인 형태/구두점 제거 (토큰은 공백 하나로 구분)
+def normalize_name(name):
+    # NFKC 가 '㈜' 를 '(주)' 로 펼쳐 줌
+    text = unicodedata.normalize('NFKC', str(name)).upper()
+    for suffix in _KOREAN_SUFFIXES:
+        text = text.replace(suffix, ' ')
+    tokens = _PUNCTUATION.sub(' ', text).split()
+    while len(tokens) > 1 and tokens[-1] in _LATIN_SUFFIXES:
+        tokens.pop()
+    return ' '.join(tokens)
+
+
+def _bigrams(key):
+    return frozenset(key[i:i + 2] for i in range(len(key) - 1)) or frozenset([key])
+
+
+# 여러 토큰 이름의 마지막 토큰이 문자로만 되어 있으면 반환 (예: 'ABC TRADING A' → 'A')
+def _letter_tail(key):
+    tokens = key.split()
+    return tokens[-1] if len(tokens) > 1 and tokens[-1].isalpha() else None
+
+
+# 두 이름 모두 문자 토큰으로 끝나면 그 토큰이 같아야 함 (한쪽만 있으면 띄어쓰기 차이일 수 있어 비교하지 않음)
+def _same_tail(a, b):
+    return a is None or b is None or a == b
+
+
+def _similar(a, b, grams):
+    ga, gb = grams[a], grams[b]
+    return 2 * len(ga & gb) / (len(ga) + len(gb)) >= SIMILARITY_THRESHOLD
+
+
+class _UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, i):
+        parent = self.parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def _blocks(keys):
+    # 블록 키: 공백을 뺀 앞 PREFIX_LENGTH 글자 + 길이 MIN_TOKEN_LENGTH 이상인 토큰 각각
+    blocks = {}
+    for i, key in enumerate(keys):
+        squashed = key.replace(' ', '')
+        blocks.setdefault(('prefix', squashed[:PREFIX_LENGTH]), []).append(i)
+        for token in set(key.split()):
+            if len(token) >= MIN_TOKEN_LENGTH:
+                blocks.setdefault(('token', token), []).append(i)
+    return blocks.values()
+
+
+def _candidate_pairs(members, keys):
+    if len(members) <= MAX_BLOCK:
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                yield members[x], members[y]
+        return
+    ordered = sorted(members, key=keys.__getitem__)
+    for x in range(len(ordered)):
+        for y in range(x + 1, min(x + 1 + WINDOW, len(ordered))):
+            yield ordered[x], ordered[y]
+
+
+# 🔗 별칭 → 대표 이름 매핑 (이름이 바뀌는 별칭만 포함)
+# 0) 수동 별칭 파일의 이름 바꾸기를 먼저 적용 (영문/한글 표기처럼 자동으로 잇기 어려운 경우)
+# 1) 정규화 이름이 같으면 같은 수출자 (예: '삼성전자(주)' / '삼성전자 주식회사')
+# 2) 블록(앞 글자/토큰)을 공유하는 정규화 이름끼리만 유사도 비교 → 전체 쌍 비교 없음
+#    숫자 부분이 다르면 다른 수출자 (예: '수출사1' / '수출사10')
+#    둘 다 문자로만 된 마지막 토큰이 있는데 서로 다르면 다른 수출자 (예: 'ABC TRADING A' / 'ABC TRADING B')
+# 수동 별칭에서 '따로 유지' 로 지정한 이름(과 그 이름으로 바꾼 별칭)은 자동 병합하지 않음
+# 대표 이름은 묶음 안에서 weights(컨테이너수 합계)가 가장 큰 이름
+def resolve(names, weights=None, overrides=None):
+    names = [str(name) for name in names]
+    weights = weights or {}
+    overrides = overrides or {}
+    renamed = [overrides.get(name, name) for name in names]
+    kept = {alias for alias, canonical in overrides.items() if alias == canonical}
+    normalized = ['' if name in kept else normalize_name(name) for name in renamed]
+
+    keys = sorted({key for key in normalized if key})
+    key_ids = {key: i for i, key in enumerate(keys)}
+    groups = _UnionFind(len(keys))
+    grams = [_bigrams(key.replace(' ', '')) for key in keys]
+    digits = [_DIGITS.findall(key) for key in keys]
+    tails = [_letter_tail(key) for key in keys]
+    for members in _blocks(keys):
+        if len(members) < 2:
+            continue
+        for a, b in _candidate_pairs(members, keys):
+            if digits[a] == digits[b] and _same_tail(tails[a], tails[b]) and groups.find(a) != groups.find(b) and _similar(a, b, grams):
+                groups.union(a, b)
+
+    # 같은 묶음의 이름을 모아 대표 이름 선택 (수동 별칭은 바뀐 이름에 물량을 합산)
+    clusters = {}
+    totals = {}
+    for name, target, key in zip(names, renamed, normalized):
+        cluster = groups.find(key_ids[key]) if key else ('raw', target)
+        clusters.setdefault(cluster, []).append(name)
+        totals[target] = totals.get(target, 0) + weights.get(name, 0)
+
+    mapping = {}
+    for members in clusters.values():
+        targets = {overrides.get(name, name) for name in members}
+        canonical = min(targets, key=lambda name: (-totals[name], len(name), name))
+        mapping.update({name: canonical for name in members if name != canonical})
+    return mapping
+
+
+def read_overrides(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        return {row['alias'].strip(): row['canonical'].strip()
+                for row in csv.DictReader(f) if row.get('alias') and row.get('canonical')}
+
+
+# 🗂️ 카테고리 컬럼의 별칭을 대표 이름으로 교체 (행 데이터는 코드 재매핑만, 문자열 비교 없음)
+def canonicalize(column, mapping):
+    categories = column.cat.categories
+    targets = pd.Index([mapping.get(name, name) for name in categories])
+    canonical = pd.Index(sorted(set(targets)))
+    recode = canonical.get_indexer(targets)
+    codes = column.cat.codes.to_numpy()
+    new_codes = np.where(codes >= 0, recode[np.where(codes >= 0, codes, 0)], -1)
+    return pd.Categorical.from_codes(new_codes, canonical)
@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import openpyxl
+
+# 📁 내보낸 파일 저장 위치 / 한 번에 변환하는 행 수
+EXPORT_DIR = 'exports'
+EXPORT_CHUNK_ROWS = 50000
+# 엑셀 한 시트의 최대 데이터 행 수 (넘으면 다음 시트에 이어서 씀)
+EXCEL_SHEET_ROWS = 1_048_575
+# 동시에 파일을 만드는 작업 수 / 내보낸 파일 보관 시간
+EXPORT_WORKERS = 2
+EXPORT_TTL_SECONDS = 60 * 60
+
+FORMATS = {'csv': 'text/csv', 'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'}
+
+
+def _chunks(table, chunk_rows):
+    for start in range(0, len(table), chunk_rows):
+        yield table.iloc[start:start + chunk_rows]
+
+
+def _rows(chunk):
+    # 카테고리/넘파이 값을 엑셀이 받는 파이썬 값으로 (결측은 빈 칸)
+    values = chunk.astype(object).where(chunk.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+# 📝 CSV: 청크마다 문자열로 바꿔 바로 파일에 씀 (엑셀에서 한글이 깨지지 않도록 BOM 포함)
+def write_csv(table, target, chunk_rows=EXPORT_CHUNK_ROWS, progress=None):
+    with open(target, 'w', encoding='utf-8-sig', newline='') as f:
+        table.head(0).to_csv(f, index=False)
+        written = 0
+        for chunk in _chunks(table, chunk_rows):
+            chunk.to_csv(f, index=False, header=False)
+            written += len(chunk)
+            if progress is not None:
+                progress(written)
+
+
+# 📝 엑셀: write_only 모드라 행을 바로 임시 파일로 내보냄 (통합 문서 전체를 메모리에 만들지 않음)
+def write_xlsx(table, target, chunk_rows=EXPORT_CHUNK_ROWS, progress=None):
+    workbook = openpyxl.Workbook(write_only=True)
+    header = [str(col) for col in table.columns]
+    sheet = None
+    sheet_rows = EXCEL_SHEET_ROWS
+    written = 0
+    for chunk in _chunks(table, chunk_rows):
+        for row in _rows(chunk):
+            if sheet_rows >= EXCEL_SHEET_ROWS:
+                sheet = workbook.create_sheet(f"Sheet{len(workbook.worksheets) + 1}")
+                sheet.append(header)
+                sheet_rows = 0
+            sheet.append(row)
+            sheet_rows += 1
+        written += len(chunk)
+        if progress is not None:
+            progress(written)
+    if sheet is None:
+        workbook.create_sheet('Sheet1').append(header)
+    workbook.save(target)
+
+
+_WRITERS = {'csv': write_csv, 'xlsx': write_xlsx}
+_pool = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix='export')
+_jobs = {}
+_lock = threading.Lock()
+
+
+def _run(job, build, fmt):
+    try:
+        table = build()
+        job['total'] = len(table)
+        # 다 쓴 뒤에 이름을 바꿔서 만드는 중인 파일을 내려받지 않도록 함
+        tmp = f"{job['path']}.tmp"
+
+        def progress(written):
+            job['written'] = written
+
+        _WRITERS[fmt](table, tmp, progress=progress)
+        os.replace(tmp, job['path'])
+    except Exception as e:
+        job['error'] = e
+    finally:
+        job['finished'] = True
+
+
+def _cleanup(directory):
+    # 보관 시간이 지난 작업과 파일 정리
+    cutoff = time.time() - EXPORT_TTL_SECONDS
+    with _lock:
+        for job_id in [job_id for job_id, job in _jobs.items() if job['finished'] and job['created'] < cutoff]:
+            del _jobs[job_id]
+    for name in os.listdir(directory):
+        target = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(target) < cutoff:
+                os.remove(target)
+        except OSError:
+            pass
+
+
+# 📥 백그라운드 내보내기 시작: build() 가 만든 표를 fmt 파일로 저장하고 작업 ID 반환
+# (build 는 작업 스레드에서 실행되므로 Streamlit 호출 없이 검색 엔진만 사용해야 함)
+def start(build, name, fmt='csv', directory=EXPORT_DIR):
+    if fmt not in _WRITERS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+    os.makedirs(directory, exist_ok=True)
+    _cleanup(directory)
+    job_id = uuid.uuid4().hex
+    job = {
+        'id': job_id,
+        'file_name': f"{name}.{fmt}",
+        'path': os.path.join(directory, f"{job_id}.{fmt}"),
+        'mime': FORMATS[fmt],
+        'created': time.time(),
+        'total': None,
+        'written': 0,
+        'error': None,
+        'finished': False,
+    }
+    with _lock:
+        _jobs[job_id] = job
+    _pool.submit(_run, job, build, fmt)
+    return job_id
+
+
+def status(job_id):
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def read(job_id):
+    with open(status(job_id)['path'], 'rb') as f:
+        return f.read()
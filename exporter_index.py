@@ -0,0 +1,127 @@
+import numpy as np
+
+import dataset
+
+EXPORTER_COLUMN = '수출자'
+
+# 🔤 한글 초성 (유니코드 음절 순서)
+CHOSUNG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+_HANGUL_START = 0xAC00
+_HANGUL_END = 0xD7A3
+_JUNG_JONG = 21 * 28
+
+
+def to_chosung(text):
+    chars = []
+    for ch in text:
+        code = ord(ch)
+        if _HANGUL_START <= code <= _HANGUL_END:
+            chars.append(CHOSUNG[(code - _HANGUL_START) // _JUNG_JONG])
+        else:
+            chars.append(ch)
+    return ''.join(chars)
+
+
+def is_chosung_query(text):
+    letters = [ch for ch in text if not ch.isspace()]
+    return bool(letters) and all(ch in CHOSUNG for ch in letters)
+
+
+def _grams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def _build_postings(keys):
+    postings = {}
+    for exporter_id, key in enumerate(keys):
+        for n in (2, 3):
+            for gram in _grams(key, n):
+                postings.setdefault(gram, []).append(exporter_id)
+    return {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+
+# 🔎 수출자 이름 목록 위의 n-gram 역색인 + (codes 를 주면) 수출자 → 큐브 행 목록
+# 수출자 ID 는 names 안의 위치 (pandas 큐브에서 만들면 수출자 카테고리 코드와 같음)
+# aliases (별칭 → 대표 이름) 를 주면 별칭 문자열로 검색해도 대표 이름의 ID 를 돌려줌
+class ExporterIndex:
+    def __init__(self, names, codes=None, aliases=None):
+        self.names = np.asarray(names, dtype=object)
+        ids = {name: i for i, name in enumerate(self.names)}
+        extra = [(alias, ids[canonical]) for alias, canonical in (aliases or {}).items()
+                 if canonical in ids and alias not in ids]
+        keys = list(self.names) + [alias for alias, _ in extra]
+        # 검색 키 → 수출자 ID (앞쪽은 이름 자신, 뒤쪽은 별칭)
+        self._owners = np.concatenate([np.arange(len(self.names)), [i for _, i in extra]]).astype(np.int32)
+        self._folded = [key.casefold() for key in keys]
+        # 초성 키는 공백을 빼서 'ㅅㅅㅈㅈ' 처럼 붙여 쓴 검색어와 맞춤
+        self._chosung = [to_chosung(name).replace(' ', '') for name in self._folded]
+        self._postings = _build_postings(self._folded)
+        self._chosung_postings = _build_postings(self._chosung)
+
+        # 수출자 코드 순으로 정렬한 행 번호 (CSR): 코드 i 의 행 = rows[offsets[i]:offsets[i + 1]]
+        self._rows = None
+        if codes is None:
+            return
+        order = np.argsort(codes, kind='stable')
+        self._rows = order[codes[order] >= 0]
+        sizes = np.bincount(codes[codes >= 0], minlength=len(self.names))
+        self._offsets = np.concatenate([[0], np.cumsum(sizes)])
+
+    def search(self, text, limit=None):
+        query = text.strip().casefold()
+        if not query:
+            return np.empty(0, dtype=np.int32)
+
+        if is_chosung_query(query):
+            query = query.replace(' ', '')
+            keys, postings = self._chosung, self._chosung_postings
+        else:
+            keys, postings = self._folded, self._postings
+
+        n = 3 if len(query) >= 3 else 2
+        if len(query) < n:
+            # 한 글자 검색은 사전 전체(행이 아닌 고유 수출자)만 훑음
+            candidates = range(len(keys))
+        else:
+            lists = [postings.get(gram) for gram in _grams(query, n)]
+            if any(ids is None for ids in lists):
+                return np.empty(0, dtype=np.int32)
+            lists.sort(key=len)
+            candidates = lists[0]
+            for ids in lists[1:]:
+                candidates = np.intersect1d(candidates, ids, assume_unique=True)
+
+        # n-gram 이 모두 포함돼도 연속 부분 문자열이 아닐 수 있으므로 최종 확인
+        matches = np.asarray([i for i in candidates if query in keys[i]], dtype=np.int32)
+        matches = np.unique(self._owners[matches])
+        return matches[:limit] if limit is not None else matches
+
+    def search_names(self, text, limit=None):
+        return self.names[self.search(text, limit)].tolist()
+
+    # 📦 수출자 코드 목록의 행만 가져오기 (선적일 범위는 행 번호 구간으로 제한, 큐브로 만든 색인만)
+    def rows(self, df, exporter_ids, start_date=None, end_date=None):
+        if self._rows is None:
+            raise ValueError("행 목록 없이 만든 수출자 색인입니다.")
+        lo, hi = 0, len(df)
+        if start_date is not None and end_date is not None:
+            lo, hi = dataset.date_bounds(df, start_date, end_date)
+
+        parts = []
+        for exporter_id in exporter_ids:
+            positions = self._rows[self._offsets[exporter_id]:self._offsets[exporter_id + 1]]
+            parts.append(positions[np.searchsorted(positions, lo):np.searchsorted(positions, hi)])
+        positions = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+        return df.iloc[positions]
+
+
+def build_index(df, aliases=None):
+    return ExporterIndex(df[EXPORTER_COLUMN].cat.categories.astype(str), df[EXPORTER_COLUMN].cat.codes.to_numpy(), aliases)
+
+
+# 🗂️ 데이터셋 버전별로 한 번만 만들어 모든 세션이 공유 (선택된 검색 백엔드가 만듦)
+def shared_index(path, backend=None):
+    # query 가 이 모듈의 build_index 를 쓰므로 호출할 때 불러옴
+    import query
+    return (backend or query.get_backend(path)).exporter_index()
+
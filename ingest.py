@@ -0,0 +1,201 @@
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pyarrow.feather as feather
+
+import dataset
+import entity_resolution
+
+
+# 📅 적재 월: 파일 이름의 YYYYMM, 없으면 선적일이 가장 많은 달
+def detect_month(path, rows=None):
+    match = re.search(r'(20\d{2})(0[1-9]|1[0-2])', os.path.basename(path))
+    if match:
+        return match.group(0)
+    if rows is not None and dataset.DATE_COLUMN in rows.columns:
+        months = rows[dataset.DATE_COLUMN].dropna().dt.strftime('%Y%m')
+        if not months.empty:
+            return months.value_counts().idxmax()
+    return None
+
+
+def _write_json(target, value):
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(value, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp, target)
+
+
+def _write_manifest(store, manifest):
+    _write_json(os.path.join(store, dataset.MANIFEST_NAME), manifest)
+
+
+# 🔗 저장소 전체 수출자 이름으로 별칭 → 대표 이름 매핑을 다시 계산 (바뀌었으면 True)
+# 파티션 큐브의 수출자/컨테이너수 컬럼만 읽으므로 원본 행 전체를 올리지 않음
+def _resolve_aliases(store, manifest):
+    frames = [
+        feather.read_table(os.path.join(dataset.partition_dir(store, month), 'cube.arrow'),
+                           columns=[dataset.EXPORTER_COLUMN, dataset.COUNT_COLUMN]).to_pandas()
+        for month in sorted(manifest['months'])
+    ]
+    overrides = entity_resolution.read_overrides(dataset.overrides_path(store))
+    mapping = dataset.resolve_exporters(frames, overrides)
+    if mapping == dataset.read_aliases(store):
+        return False
+    _write_json(os.path.join(store, dataset.ALIASES_NAME), mapping)
+    return True
+
+
+# 새 파티션은 저장소 안의 임시 폴더에 먼저 씀 (같은 달 파일이 여러 개면 교체 전에 모두 버릴 수 있도록)
+def _stage_partition(store, month, rows, cube, version):
+    target = dataset.partition_dir(store, month)
+    staging = tempfile.mkdtemp(prefix=f"{os.path.basename(target)}.", suffix='.staging', dir=store)
+    dataset.write_snapshot(os.path.join(staging, 'rows.arrow'), version, rows)
+    dataset.write_snapshot(os.path.join(staging, 'cube.arrow'), version, cube)
+    return staging
+
+
+def _replace_partition(store, month, staging):
+    # 새 파티션을 다 쓴 뒤에 기존 파티션과 교체
+    target = dataset.partition_dir(store, month)
+    retired = f"{target}.{os.getpid()}.old"
+    if os.path.exists(target):
+        os.replace(target, retired)
+    os.replace(staging, target)
+    shutil.rmtree(retired, ignore_errors=True)
+
+
+# 🚫 적재 월이 아닌 선적일이 있으면 거부 (한 파일의 행은 한 달 파티션에만 들어가므로, 선적일이 빈 행은 허용)
+def _check_month(path, rows, month):
+    if dataset.DATE_COLUMN not in rows.columns:
+        return
+    dates = rows[dataset.DATE_COLUMN]
+    months = (dates.dt.year * 100 + dates.dt.month).dropna().astype(int).astype(str)
+    outside = months[months != month]
+    if not outside.empty:
+        raise ValueError(f"{path} 에 {month} 이 아닌 달의 선적일이 {len(outside)}행 있습니다 "
+                         f"({', '.join(sorted(outside.unique()))}). 달마다 파일을 나눠서 적재해 주세요.")
+
+
+def _partition_entry(path, version, rows, cube):
+    return {
+        'source': os.path.basename(path),
+        'source_version': version,
+        'rows': len(rows),
+        'cube_rows': len(cube),
+        'ingested_at': datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+# ⚙️ 작업 프로세스: 엑셀을 스트리밍으로 읽고 해당 월 파티션(행 + 큐브)을 임시 폴더에 씀
+# 부모 프로세스에는 임시 폴더 경로와 manifest 항목만 돌려주므로 여러 파일을 동시에 처리해도 메모리가 쌓이지 않음
+def _build_partition(path, store, month, version):
+    rows = dataset.read_workbook(path)
+    month = month or detect_month(path, rows)
+    if month is None:
+        raise ValueError(f"적재 월을 알 수 없습니다: {path} (--month 로 지정해 주세요)")
+    _check_month(path, rows, month)
+
+    # 해당 월 파티션의 파생 집계(큐브)만 다시 계산
+    cube = dataset.build_cube(rows)
+    staging = _stage_partition(store, month, rows, cube, version)
+    return month, staging, _partition_entry(path, version, rows, cube)
+
+
+# 같은 원본 파일(이름 + 버전)이 이미 적재되어 있는지 (월을 모르면 manifest 전체에서 찾음)
+def _already_ingested(manifest, path, month, version):
+    return any(
+        entry['source'] == os.path.basename(path) and entry['source_version'] == version and month in (None, entry_month)
+        for entry_month, entry in manifest['months'].items()
+    )
+
+
+# 📥 월별 엑셀 여러 개를 저장소에 적재 (같은 파일이면 건너뜀, 같은 달이면 교체)
+def ingest_files(paths, store=dataset.STORE_DIR, month=None, force=False, workers=None):
+    os.makedirs(store, exist_ok=True)
+    manifest = dataset.read_manifest(store)
+
+    jobs = []
+    for path in paths:
+        version = dataset.source_version(path, aliases=False)
+        path_month = month or detect_month(path)
+        if not force and _already_ingested(manifest, path, path_month, version):
+            continue
+        jobs.append((path, path_month, version))
+
+    # 파일 이름으로 알 수 있는 달은 읽기 전에 미리 확인
+    months = [path_month for _, path_month, _ in jobs if path_month]
+    if len(months) != len(set(months)):
+        raise ValueError("같은 달의 파일이 두 개 이상 지정되었습니다.")
+
+    done = []
+    errors = []
+    if len(jobs) <= 1 or workers == 1:
+        try:
+            for job in jobs:
+                done.append(_build_partition(job[0], store, job[1], job[2]))
+        except BaseException:
+            for _, staging, _ in done:
+                shutil.rmtree(staging, ignore_errors=True)
+            raise
+    else:
+        max_workers = workers or min(len(jobs), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(_build_partition, path, store, path_month, version): path
+                       for path, path_month, version in jobs}
+            for future in as_completed(futures):
+                try:
+                    done.append(future.result())
+                except Exception as e:
+                    errors.append((futures[future], e))
+
+    # 선적일로 알아낸 달까지 포함해서 다시 확인: 같은 달이 둘 이상이면 어느 파티션도 교체하지 않음
+    months = [path_month for path_month, _, _ in done]
+    if len(months) != len(set(months)):
+        for _, staging, _ in done:
+            shutil.rmtree(staging, ignore_errors=True)
+        duplicated = sorted({path_month for path_month in months if months.count(path_month) > 1})
+        raise ValueError(f"같은 달의 파일이 두 개 이상 지정되었습니다: {', '.join(duplicated)}")
+
+    # 성공한 파티션은 실패한 파일이 있어도 교체하고 manifest 에 반영
+    # (별칭 매핑을 먼저 쓰고 manifest 를 갱신해야 저장소 버전이 바뀌면서 새 매핑이 적용됨)
+    for path_month, staging, entry in done:
+        _replace_partition(store, path_month, staging)
+        manifest['months'][path_month] = entry
+    aliases_changed = bool(manifest['months']) and _resolve_aliases(store, manifest)
+    if done or aliases_changed:
+        _write_manifest(store, manifest)
+    if errors:
+        path, error = errors[0]
+        raise RuntimeError(f"{path} 적재 중 오류 발생: {error}") from error
+    return sorted(path_month for path_month, _, _ in done)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="월별 선적 엑셀을 월 단위 파티션 저장소에 적재합니다.")
+    parser.add_argument('files', nargs='+', help="적재할 월별 엑셀 파일 (예: 202506.xlsx)")
+    parser.add_argument('--store', default=dataset.STORE_DIR, help=f"저장소 폴더 (기본값: {dataset.STORE_DIR})")
+    parser.add_argument('--month', help="적재 월 YYYYMM (파일이 하나일 때만, 기본값: 파일 이름에서 추출)")
+    parser.add_argument('--force', action='store_true', help="이미 적재된 같은 파일도 다시 적재")
+    parser.add_argument('--workers', type=int, help="동시에 처리할 프로세스 수 (기본값: CPU 코어 수)")
+    args = parser.parse_args(argv)
+
+    if args.month and len(args.files) > 1:
+        parser.error("--month 는 파일을 하나만 지정할 때 사용할 수 있습니다.")
+
+    months = ingest_files(args.files, args.store, args.month, args.force, args.workers)
+    for month in months:
+        print(f"✅ {dataset.partition_dir(args.store, month)}")
+    skipped = len(args.files) - len(months)
+    if skipped:
+        print(f"⏭️ 이미 적재된 파일 {skipped}개를 건너뛰었습니다.")
+
+
+if __name__ == "__main__":
+    main()
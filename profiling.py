@@ -0,0 +1,197 @@
+import contextvars
+import cProfile
+import datetime
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from collections import deque
+
+# ⏱️ 검색 단계별 계측 (기본값: 꺼짐)
+# - QUERY_PROFILE=1 이면 켜짐, 관리자 성능 패널에서도 켜고 끌 수 있음
+# - QUERY_LOG=<경로> 이면 계측 결과를 JSON 한 줄씩 파일에 추가 (오프라인 분석용)
+#   기록 파일만 지정하면 계측도 켜진 상태로 시작 (QUERY_PROFILE=0 이면 꺼진 상태), 켜고 끄기와는 별개
+PROFILE_ENV = 'QUERY_PROFILE'
+LOG_ENV = 'QUERY_LOG'
+# 성능 패널에 보관하는 최근 검색 수
+HISTORY_SIZE = 50
+# cProfile 캡처 시 남기는 상위 함수 수
+PROFILE_TOP = 25
+
+_log_path = os.environ.get(LOG_ENV) or None
+_enabled = os.environ.get(PROFILE_ENV, '1' if _log_path else '') not in ('', '0')
+_history = deque(maxlen=HISTORY_SIZE)
+_lock = threading.Lock()
+_current = contextvars.ContextVar('query_trace', default=None)
+
+
+def enabled():
+    return _enabled
+
+
+def set_enabled(value):
+    global _enabled
+    _enabled = bool(value)
+
+
+def set_log_path(path):
+    global _log_path
+    _log_path = path or None
+
+
+def log_path():
+    return _log_path
+
+
+class _NullStage:
+    # 계측이 꺼져 있을 때 쓰는 빈 단계 (속성 대입만 받고 아무것도 기록하지 않음)
+    rows_in = None
+    rows_out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL = _NullStage()
+
+
+class Stage:
+    def __init__(self, trace, name, rows_in):
+        self.trace = trace
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.stages.append({
+            'name': self.name,
+            'ms': (time.perf_counter() - self.started) * 1000,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+        })
+        return False
+
+
+class Trace:
+    def __init__(self, name, fields, profile):
+        self.name = name
+        self.fields = fields
+        self.stages = []
+        self.profiler = cProfile.Profile() if profile else None
+        # 작업 스레드에서 따로 캡처한 프로파일 (cProfile 은 켠 스레드만 기록)
+        self.worker_profilers = []
+        self.profile = None
+
+    def __enter__(self):
+        self.token = _current.set(self)
+        self.started_at = datetime.datetime.now().isoformat(timespec='seconds')
+        self.started = time.perf_counter()
+        if self.profiler is not None:
+            try:
+                self.profiler.enable()
+            except ValueError:
+                # Python 3.12+: 다른 검색이 이미 캡처 중이면 프로파일러를 하나 더 켤 수 없음 → 이번 검색은 캡처 생략
+                self.profiler = None
+                self.profile = "다른 검색이 프로파일을 캡처하는 중이라 이번 검색은 캡처하지 않았습니다."
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.profiler is not None:
+            self.profiler.disable()
+            out = io.StringIO()
+            stats = pstats.Stats(self.profiler, stream=out)
+            for profiler in self.worker_profilers:
+                stats.add(profiler)
+            stats.sort_stats('cumulative').print_stats(PROFILE_TOP)
+            self.profile = out.getvalue()
+        _current.reset(self.token)
+        record = {
+            'time': self.started_at,
+            'name': self.name,
+            'total_ms': (time.perf_counter() - self.started) * 1000,
+            'stages': self.stages,
+            'fields': self.fields,
+            'error': repr(exc) if exc is not None else None,
+            'profile': self.profile,
+        }
+        _record(record)
+        return False
+
+
+# 🧵 검색 하나를 감싸는 계측 구간 (이미 진행 중인 구간이 있으면 그 안에 합쳐짐)
+# profile=True 이면 구간 전체를 cProfile 로 캡처 (profiled 로 감싼 작업 스레드의 계산 포함)
+def trace(name, profile=False, **fields):
+    if not enabled() or _current.get() is not None:
+        return _NULL
+    return Trace(name, {key: _jsonable(value) for key, value in fields.items()}, profile)
+
+
+# ⏱️ 현재 검색 안의 이름 있는 단계 (진행 중인 검색이 없으면 비용 없는 빈 단계)
+def stage(name, rows_in=None):
+    current = _current.get()
+    if current is None:
+        return _NULL
+    return Stage(current, name, rows_in)
+
+
+# 🧵 작업 스레드에서 func 실행: 현재 검색이 cProfile 캡처 중이면 이 스레드도 캡처해서 검색 프로파일에 합침
+# (스케줄러/분석 풀은 컨텍스트를 복사해서 넘기므로 작업 스레드에서도 현재 검색을 알 수 있음)
+def profiled(func, *args):
+    current = _current.get()
+    if current is None or current.profiler is None:
+        return func(*args)
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+: 프로파일러가 모든 스레드를 함께 기록하므로 이미 켜져 있으면 그대로 실행
+        return func(*args)
+    try:
+        return func(*args)
+    finally:
+        profiler.disable()
+        with _lock:
+            current.worker_profilers.append(profiler)
+
+
+def _jsonable(value):
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if hasattr(value, '_asdict'):
+        return _jsonable(value._asdict())
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    return str(value)
+
+
+def _record(record):
+    with _lock:
+        _history.append(record)
+        if _log_path is not None:
+            with open(_log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+# 📋 최근 검색 계측 결과 (최신순)
+def recent(limit=HISTORY_SIZE):
+    with _lock:
+        return list(reversed(_history))[:limit]
+
+
+def clear():
+    with _lock:
+        _history.clear()
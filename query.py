@@ -0,0 +1,392 @@
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import catalog
+import dataset
+import exporter_index
+import profiling
+import result_cache
+import scheduler
+
+# 🧠 검색 결과 캐시 최대 크기
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# 🚦 동시에 계산하는 검색 수 / 세션당 끝나지 않은 검색 수 상한
+# (현황 분석은 표 세 개를 한 번에 예약하므로 3개까지)
+QUERY_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+SESSION_QUEUE_LIMIT = 3
+# 대기열 순번 표시 갱신 간격 (초)
+QUEUE_POLL_SECONDS = 0.25
+
+# 🔎 검색 조건
+QuerySpec = namedtuple(
+    'QuerySpec',
+    ['start_date', 'end_date', 'loading_port', 'arrival_country', 'arrival_port', 'min_containers', 'exporters'],
+    defaults=['All', 'All', 'All', 0, ()],
+)
+
+# 📊 요청 가능한 집계 결과 → 그룹 키 컬럼
+OUTPUTS = {
+    'exporters': ['수출자'],
+    'carriers': ['컨테이너선사'],
+    'countries': ['도착지국가'],
+    'country_carriers': ['도착지국가', '컨테이너선사'],
+    'routes': ['수출자', '선적항', '도착항'],
+    'detail': ['수출자', '선적항', '도착지국가', '도착항'],
+    'country_exporters': ['도착지국가', '수출자'],
+    'carrier_exporters': ['컨테이너선사', '수출자'],
+}
+
+# 📈 기간 비교 결과 컬럼
+PREVIOUS_COLUMN = '이전 컨테이너수'
+CURRENT_COLUMN = '현재 컨테이너수'
+DELTA_COLUMN = '증감'
+GROWTH_COLUMN = '증감률(%)'
+STATUS_COLUMN = '구분'
+# 기간 라벨 (비교 범위 안에서 어느 기간에도 속하지 않는 행은 -1)
+_CURRENT, _PREVIOUS = 0, 1
+
+_FILTERS = [('loading_port', '선적항'), ('arrival_country', '도착지국가'), ('arrival_port', '도착항')]
+_EXPORTER = '수출자'
+
+
+def make_spec(start_date, end_date, loading_port='All', arrival_country='All', arrival_port='All',
+              min_containers=0, exporters=()):
+    return QuerySpec(
+        pd.Timestamp(start_date).date(),
+        pd.Timestamp(end_date).date(),
+        str(loading_port),
+        str(arrival_country),
+        str(arrival_port),
+        int(min_containers),
+        tuple(sorted(str(name) for name in exporters)),
+    )
+
+
+def _category_code(column, value):
+    # 사전에 없는 값이면 어떤 행과도 일치하지 않는 -2
+    categories = column.cat.categories
+    return categories.get_loc(value) if value in categories else -2
+
+
+# 결과에 나온 값만 사전으로 남김 (상위 몇 행만 보여 줘도 전체 수출자 사전이 함께 직렬화되지 않도록)
+def _compact(codes, categories):
+    used, codes = np.unique(codes, return_inverse=True)
+    return pd.Categorical.from_codes(codes.ravel(), categories[used])
+
+
+# 컨테이너수: 정수 컬럼은 int64, 소수가 있는 컬럼은 float64 (합계도 같은 타입으로 돌려줌)
+def _count_values(rows):
+    counts = rows[dataset.COUNT_COLUMN].to_numpy()
+    return counts.astype(np.int64 if np.issubdtype(counts.dtype, np.integer) else np.float64)
+
+
+def _group_sum(codes, counts, columns, categories):
+    valid = np.logical_and.reduce([codes[col] >= 0 for col in columns])
+    weights = counts[valid]
+
+    if len(columns) == 1:
+        col = columns[0]
+        keys = codes[col][valid]
+        size = len(categories[col])
+        sums = np.bincount(keys, weights=weights, minlength=size)
+        present = np.flatnonzero(np.bincount(keys, minlength=size))
+        result = {col: _compact(present, categories[col])}
+        result[dataset.COUNT_COLUMN] = sums[present].astype(counts.dtype)
+        return pd.DataFrame(result)
+
+    # 여러 키는 코드 조합을 하나의 정수 키로 묶어서 한 번에 합산
+    sizes = [len(categories[col]) for col in columns]
+    combined = np.ravel_multi_index([codes[col][valid].astype(np.int64) for col in columns], sizes)
+    keys, inverse = np.unique(combined, return_inverse=True)
+    sums = np.bincount(inverse.ravel(), weights=weights, minlength=len(keys))
+    parts = np.unravel_index(keys, sizes)
+    result = {col: _compact(part, categories[col]) for col, part in zip(columns, parts)}
+    result[dataset.COUNT_COLUMN] = sums.astype(counts.dtype)
+    return pd.DataFrame(result)
+
+
+# 🧹 선적항/도착지국가/도착항/수출자 조건 + 최소 컨테이너 수를 만족하는 행 마스크
+# periods 가 있으면 최소 컨테이너 수는 기간별 수출자 합계 중 큰 값으로 판정
+def _filter_mask(rows, spec, counts, periods=None):
+    mask = np.ones(len(rows), dtype=bool)
+    for field, col in _FILTERS:
+        value = getattr(spec, field)
+        if value != 'All':
+            mask &= rows[col].cat.codes.to_numpy() == _category_code(rows[col], value)
+
+    exporter_codes = rows[_EXPORTER].cat.codes.to_numpy()
+    if spec.exporters:
+        wanted = [_category_code(rows[_EXPORTER], name) for name in spec.exporters]
+        mask &= np.isin(exporter_codes, wanted)
+    if periods is not None:
+        mask &= periods >= 0
+
+    # 수출자가 비어 있는 행은 수출자별 합계에 잡히지 않으므로 제외
+    mask &= exporter_codes >= 0
+    if spec.min_containers > 0:
+        exporter_size = len(rows[_EXPORTER].cat.categories)
+        if periods is None:
+            totals = np.bincount(exporter_codes[mask], weights=counts[mask], minlength=exporter_size)
+        else:
+            keys = exporter_codes[mask].astype(np.int64) * 2 + periods[mask]
+            totals = np.bincount(keys, weights=counts[mask], minlength=exporter_size * 2).reshape(-1, 2).max(axis=1)
+        mask &= totals[np.where(exporter_codes >= 0, exporter_codes, 0)] >= spec.min_containers
+    return mask
+
+
+# ⚙️ 조건 필터 + 최소 컨테이너 수 + 요청된 집계를 한 번에 계산
+# - 선적일: 정렬된 큐브에서 이진 탐색 슬라이스
+# - 선적항/도착지국가/도착항/수출자: 카테고리 코드 비교로 만든 마스크 하나
+# - 최소 컨테이너 수: 수출자별 합계 벡터로 판정 (행 단위 isin 없음)
+def run_query(df, spec, outputs):
+    with profiling.stage('date_slice', len(df)) as stage:
+        rows = dataset.date_slice(df, spec.start_date, spec.end_date)
+        counts = _count_values(rows)
+        stage.rows_out = len(rows)
+
+    with profiling.stage('mask', len(rows)) as stage:
+        mask = _filter_mask(rows, spec, counts)
+        kept = counts[mask]
+        stage.rows_out = len(kept)
+
+    results = {}
+    columns = sorted({col for name in outputs if name in OUTPUTS for col in OUTPUTS[name]})
+    codes = {col: rows[col].cat.codes.to_numpy()[mask] for col in columns}
+    categories = {col: rows[col].cat.categories for col in columns}
+    for name in outputs:
+        if name in OUTPUTS:
+            with profiling.stage(f"group_by:{name}", len(kept)) as stage:
+                results[name] = _group_sum(codes, kept, OUTPUTS[name], categories)
+                stage.rows_out = len(results[name])
+    return results
+
+
+def _group_compare(codes, counts, periods, columns, categories):
+    valid = np.logical_and.reduce([codes[col] >= 0 for col in columns])
+    weights = counts[valid]
+    current = np.where(periods[valid] == _CURRENT, weights, 0)
+    previous = np.where(periods[valid] == _PREVIOUS, weights, 0)
+
+    # 기간과 무관한 그룹 키 하나로 묶고, 기간별 합계는 가중치만 바꿔 두 번 bincount
+    sizes = [len(categories[col]) for col in columns]
+    combined = np.ravel_multi_index([codes[col][valid].astype(np.int64) for col in columns], sizes)
+    keys, inverse = np.unique(combined, return_inverse=True)
+    inverse = inverse.ravel()
+    parts = np.unravel_index(keys, sizes)
+    result = {col: _compact(part, categories[col]) for col, part in zip(columns, parts)}
+    result[PREVIOUS_COLUMN] = np.bincount(inverse, weights=previous, minlength=len(keys)).astype(counts.dtype)
+    result[CURRENT_COLUMN] = np.bincount(inverse, weights=current, minlength=len(keys)).astype(counts.dtype)
+    return add_comparison_columns(pd.DataFrame(result))
+
+
+# 이전/현재 컨테이너수로 증감, 증감률(%), 구분(신규/이탈/증가/감소/유지) 컬럼 추가
+def add_comparison_columns(table):
+    before = table[PREVIOUS_COLUMN].to_numpy()
+    after = table[CURRENT_COLUMN].to_numpy()
+    table[DELTA_COLUMN] = after - before
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table[GROWTH_COLUMN] = np.where(before > 0, (after - before) / np.maximum(before, 1) * 100, np.nan).round(1)
+    table[STATUS_COLUMN] = np.select(
+        [before == 0, after == 0, after > before, after < before],
+        ['신규', '이탈', '증가', '감소'],
+        default='유지',
+    )
+    return table
+
+
+# 📈 기간 비교: 두 기간을 합친 범위를 한 번만 훑어 기간 라벨을 붙이고 그룹별 두 합계를 동시에 계산
+# - spec 의 날짜가 현재 기간, previous_start ~ previous_end 가 비교 기간 (겹치면 안 됨)
+# - 결과: 그룹 키 + 이전/현재 컨테이너수 + 증감 + 증감률(%) + 구분(신규/이탈/증가/감소/유지)
+def comparison_period(spec, previous_start, previous_end):
+    previous_start = pd.Timestamp(previous_start).date()
+    previous_end = pd.Timestamp(previous_end).date()
+    if previous_start <= spec.end_date and spec.start_date <= previous_end:
+        raise ValueError("비교 기간이 현재 기간과 겹칩니다.")
+    return previous_start, previous_end
+
+
+def run_comparison(df, spec, previous_start, previous_end, outputs):
+    previous_start, previous_end = comparison_period(spec, previous_start, previous_end)
+
+    with profiling.stage('date_slice', len(df)) as stage:
+        current_lo, current_hi = dataset.date_bounds(df, spec.start_date, spec.end_date)
+        previous_lo, previous_hi = dataset.date_bounds(df, previous_start, previous_end)
+        lo = min(current_lo, previous_lo)
+        rows = df.iloc[lo:max(current_hi, previous_hi)]
+        # 큐브가 선적일 순으로 정렬되어 있으므로 기간 라벨은 위치 구간 두 개로 정해짐
+        periods = np.full(len(rows), -1, dtype=np.int8)
+        periods[current_lo - lo:current_hi - lo] = _CURRENT
+        periods[previous_lo - lo:previous_hi - lo] = _PREVIOUS
+        counts = _count_values(rows)
+        stage.rows_out = len(rows)
+
+    with profiling.stage('mask', len(rows)) as stage:
+        mask = _filter_mask(rows, spec, counts, periods)
+        kept = counts[mask]
+        kept_periods = periods[mask]
+        stage.rows_out = len(kept)
+
+    columns = sorted({col for name in outputs for col in OUTPUTS[name]})
+    codes = {col: rows[col].cat.codes.to_numpy()[mask] for col in columns}
+    categories = {col: rows[col].cat.categories for col in columns}
+    results = {}
+    for name in outputs:
+        with profiling.stage(f"compare:{name}", len(kept)) as stage:
+            results[name] = _group_compare(codes, kept, kept_periods, OUTPUTS[name], categories)
+            stage.rows_out = len(results[name])
+    return results
+
+
+# 🔌 검색 백엔드: 같은 QuerySpec/OUTPUTS 를 받아 같은 모양의 결과를 돌려줌
+# - version(): 캐시 키에 쓰는 데이터 버전 / load(): 데이터 준비 (예열)
+# - run_query(), run_comparison(): 검색, 기간 비교
+# - catalog(), exporter_index(): 사이드바 선택지 목록, 수출자 이름 색인 (데이터셋 버전별로 공유)
+# - pandas: 공용 큐브를 메모리에 올려 카테고리 코드로 계산 (기본값)
+# - duckdb: 디스크의 데이터베이스 파일을 내장 SQL 엔진으로 직접 조회, pandas 큐브를 올리지 않음 (선택 설치: pip install duckdb, requirements.txt 참고, sql_backend.py)
+# 환경 변수 QUERY_BACKEND 로 선택
+BACKEND_ENV = 'QUERY_BACKEND'
+DEFAULT_BACKEND = 'pandas'
+
+
+class PandasBackend:
+    name = 'pandas'
+
+    def __init__(self, path):
+        self.path = path
+
+    # 캐시 키에 쓰는 데이터 버전 (원본이 바뀌면 달라짐)
+    def version(self):
+        return dataset.shared_cube(self.path).attrs[dataset.VERSION_ATTR]
+
+    def load(self):
+        dataset.shared_cube(self.path)
+
+    def run_query(self, spec, outputs):
+        cube = dataset.shared_cube(self.path)
+        if spec.exporters:
+            # 수출자 조건이 있으면 이름 색인의 수출자별 행 목록으로 해당 수출자 행만 골라서 계산
+            ids = cube[_EXPORTER].cat.categories.get_indexer(list(spec.exporters))
+            cube = self.exporter_index().rows(cube, ids[ids >= 0], spec.start_date, spec.end_date)
+        return run_query(cube, spec, outputs)
+
+    def run_comparison(self, spec, previous_start, previous_end, outputs):
+        return run_comparison(dataset.shared_cube(self.path), spec, previous_start, previous_end, outputs)
+
+    def catalog(self):
+        return dataset.shared(self.path, 'catalog', lambda p: catalog.build_catalog(dataset.shared_cube(p)))
+
+    def exporter_index(self):
+        return dataset.shared(self.path, 'exporter_index', lambda p: exporter_index.build_index(dataset.shared_cube(p), dataset.exporter_aliases(p)))
+
+
+def _duckdb_backend(path):
+    # duckdb 가 없는 환경에서도 query 모듈은 import 되도록 선택할 때만 불러옴
+    import sql_backend
+    return sql_backend.DuckDBBackend(path)
+
+
+BACKENDS = {'pandas': PandasBackend, 'duckdb': _duckdb_backend}
+
+
+def get_backend(path, name=None):
+    name = name or os.environ.get(BACKEND_ENV, DEFAULT_BACKEND)
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 검색 백엔드입니다: {name} (가능한 값: {', '.join(BACKENDS)})")
+    return BACKENDS[name](path)
+
+
+def _result_key(backend, spec, outputs):
+    return backend.version() + (backend.name, spec, tuple(outputs))
+
+
+_results = result_cache.ResultCache(RESULT_CACHE_MAX_BYTES)
+
+
+# 🧠 선택된 백엔드로 검색 (같은 조건 + 같은 데이터 버전이면 모든 세션이 결과를 재사용)
+# (앱에서 계측 구간을 열지 않았으면 검색 하나를 자체 구간으로 기록)
+def cached_query(path, spec, outputs, backend=None):
+    with profiling.trace('query', spec=spec, outputs=outputs):
+        backend = backend or get_backend(path)
+        with profiling.stage('load'):
+            key = _result_key(backend, spec, outputs)
+        with profiling.stage('cache_lookup') as stage:
+            results = _results.get(key)
+            stage.rows_out = 0 if results is None else 1
+        if results is None:
+            results = backend.run_query(spec, outputs)
+            _results.put(key, results)
+        # 얕은 복사: 호출한 쪽에서 컬럼을 추가해도 캐시된 결과는 그대로 유지
+        return {name: frame.copy(deep=False) for name, frame in results.items()}
+
+
+_scheduler = scheduler.QueryScheduler(QUERY_WORKERS, SESSION_QUEUE_LIMIT)
+QueueFullError = scheduler.QueueFullError
+
+
+# 🎫 캐시에 없는 계산은 스케줄러에 예약 (같은 계산이 이미 대기/계산 중이면 그 예약을 공유)
+# cache=False 면 결과를 결과 캐시에 넣지 않음 (한 번 쓰고 버리는 큰 결과, 예: 파일 내보내기)
+def _schedule(key, compute, session, cache=True):
+    results = _results.get(key)
+    if results is not None:
+        return scheduler.CompletedTicket(results)
+
+    def run():
+        results = profiling.profiled(compute)
+        if cache:
+            _results.put(key, results)
+        return results
+
+    return _scheduler.submit(key, run, session)
+
+
+def submit_query(path, spec, outputs, session=None, backend=None, cache=True):
+    backend = backend or get_backend(path)
+    return _schedule(_result_key(backend, spec, outputs), lambda: backend.run_query(spec, outputs), session, cache)
+
+
+# 🚦 예약이 끝날 때까지 기다림: 기다리는 동안 on_wait(대기 순번) 호출 (0 = 계산 중)
+# 대기 중에 호출한 쪽이 중단되면 (예: Streamlit 재실행) 예약을 놓아서 아무도 기다리지 않는 계산은 취소
+def wait_ticket(ticket, on_wait=None):
+    try:
+        with profiling.stage('queue_wait'):
+            while not ticket.done():
+                if on_wait is not None:
+                    on_wait(ticket.position())
+                ticket.wait(QUEUE_POLL_SECONDS)
+        results = ticket.result()
+    finally:
+        ticket.release()
+    # 얕은 복사: 호출한 쪽에서 컬럼을 추가해도 캐시된 결과는 그대로 유지
+    return {name: frame.copy(deep=False) for name, frame in results.items()}
+
+
+# 🚦 스케줄러를 거치는 검색
+def scheduled_query(path, spec, outputs, session=None, on_wait=None, backend=None, cache=True):
+    with profiling.trace('query', spec=spec, outputs=outputs):
+        return wait_ticket(submit_query(path, spec, outputs, session, backend, cache), on_wait)
+
+
+def scheduler_stats():
+    return _scheduler.stats()
+
+
+def submit_comparison(path, spec, previous_start, previous_end, outputs, session=None, backend=None):
+    backend = backend or get_backend(path)
+    previous_start = pd.Timestamp(previous_start).date()
+    previous_end = pd.Timestamp(previous_end).date()
+    with profiling.stage('load'):
+        key = backend.version() + (backend.name, 'comparison', spec, previous_start, previous_end, tuple(outputs))
+    return _schedule(key, lambda: backend.run_comparison(spec, previous_start, previous_end, outputs), session)
+
+
+# 📈 스케줄러를 거치는 기간 비교
+def scheduled_comparison(path, spec, previous_start, previous_end, outputs, session=None, on_wait=None, backend=None):
+    with profiling.trace('comparison', spec=spec, previous=(previous_start, previous_end), outputs=outputs):
+        return wait_ticket(submit_comparison(path, spec, previous_start, previous_end, outputs, session, backend), on_wait)
+
+
+def cache_stats():
+    return _results.stats()
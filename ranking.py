@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+import dataset
+
+# 🏅 표시할 순위 수 선택지 ('All' 이면 전체 정렬)
+RANK_LIMIT_OPTIONS = [100, 1000, 10000, 'All']
+
+
+# 🏅 상위 limit 개만 부분 선택(argpartition)으로 골라 정렬하고 순위를 매김
+# - 순위는 rank(method='min') 과 같음: 1 + (더 큰 값의 개수)
+#   상위 구간보다 큰 값은 모두 상위 구간 안에 있으므로 상위 구간만 보고 계산할 수 있음
+# - 같은 값끼리는 원래 순서(카테고리 이름 순)를 유지
+# - 비용: 전체 정렬 O(n log n) 대신 O(n + k log k)
+def top_ranked(table, key, limit=None, value=dataset.COUNT_COLUMN):
+    values = table[value].to_numpy()
+    if limit in (None, 'All') or limit >= len(values):
+        order = np.argsort(-values, kind='stable')
+    else:
+        threshold = values[np.argpartition(-values, limit - 1)[limit - 1]]
+        # 경계 값과 같은 행은 원래 순서대로 앞에서부터 채움
+        above = np.flatnonzero(values > threshold)
+        tied = np.flatnonzero(values == threshold)[:limit - len(above)]
+        top = np.sort(np.concatenate([above, tied]))
+        order = top[np.argsort(-values[top], kind='stable')]
+
+    descending = -values[order]
+    ranked = table.iloc[order][[key, value]].reset_index(drop=True)
+    ranked.insert(0, '순위', np.searchsorted(descending, descending, side='left') + 1)
+    return trim_categories(ranked)
+
+
+# ✂️ 잘라낸 표의 카테고리 컬럼에서 남은 행에 없는 값을 뺌
+# (상위 몇 행만 보여 줘도 전체 수출자 사전이 화면/파일로 함께 직렬화되지 않도록)
+def trim_categories(table):
+    for col in table.columns:
+        if isinstance(table[col].dtype, pd.CategoricalDtype):
+            table[col] = table[col].cat.remove_unused_categories()
+    return table
@@ -0,0 +1,74 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def estimate_size(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, dict):
+        return sum(estimate_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(item) for item in value)
+    return 64
+
+
+# 🧠 프로세스 공용 LRU 결과 캐시 (크기 기준 제거, 적중/실패 집계)
+# 키의 첫 두 요소는 (데이터셋, 버전) 이어야 함 → 버전이 바뀌면 이전 결과를 한 번에 정리
+class ResultCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def _expire(self, dataset_key, version):
+        if self._versions.get(dataset_key) == version:
+            return
+        self._versions[dataset_key] = version
+        for key in [key for key in self._entries if key[0] == dataset_key and key[1] != version]:
+            self._bytes -= self._entries.pop(key)[1]
+
+    def get(self, key):
+        with self._lock:
+            self._expire(key[0], key[1])
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._expire(key[0], key[1])
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
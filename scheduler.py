@@ -0,0 +1,129 @@
+import contextvars
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, wait
+
+
+class QueueFullError(RuntimeError):
+    pass
+
+
+# 🎫 예약 하나 (같은 키의 요청은 모두 같은 예약을 기다림)
+class Ticket:
+    def __init__(self, scheduler, key, session):
+        self.scheduler = scheduler
+        self.key = key
+        self.session = session
+        self.future = Future()
+        self.waiters = 1
+
+    def done(self):
+        return self.future.done()
+
+    # 대기열 순번 (1 = 다음 차례, 0 = 계산 중이거나 끝남)
+    def position(self):
+        return self.scheduler.position(self)
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+    def wait(self, timeout):
+        wait([self.future], timeout)
+
+    # 기다리던 쪽이 떠나면 호출: 아무도 기다리지 않고 아직 시작 전이면 취소
+    def release(self):
+        self.scheduler.release(self)
+
+
+# 🚦 무거운 검색 스케줄러
+# - 작업 스레드 수를 max_workers 로 제한 (동시에 전체 스캔하는 검색 수 상한)
+# - 같은 키의 검색이 대기/계산 중이면 새로 계산하지 않고 그 결과를 함께 기다림
+# - 세션마다 아직 끝나지 않은 검색을 session_limit 개까지만 허용 (버려진 재실행이 쌓이지 않도록)
+class QueryScheduler:
+    def __init__(self, max_workers, session_limit):
+        self.max_workers = max_workers
+        self.session_limit = session_limit
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='query')
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._waiting = []
+        self._sessions = {}
+
+    def submit(self, key, compute, session=None):
+        with self._lock:
+            ticket = self._inflight.get(key)
+            if ticket is not None:
+                ticket.waiters += 1
+                return ticket
+            if session is not None and self._sessions.get(session, 0) >= self.session_limit:
+                raise QueueFullError(f"이미 처리 중인 검색이 {self.session_limit}개 있습니다. 잠시 후 다시 시도해 주세요.")
+
+            ticket = Ticket(self, key, session)
+            self._inflight[key] = ticket
+            self._waiting.append(ticket)
+            if session is not None:
+                self._sessions[session] = self._sessions.get(session, 0) + 1
+        # 호출한 쪽의 계측 구간을 작업 스레드에서도 이어서 기록
+        self._pool.submit(contextvars.copy_context().run, self._run, ticket, compute)
+        return ticket
+
+    def _run(self, ticket, compute):
+        with self._lock:
+            if ticket not in self._waiting:
+                # 시작 전에 취소됨
+                return
+            self._waiting.remove(ticket)
+        try:
+            ticket.future.set_result(compute())
+        except BaseException as e:
+            ticket.future.set_exception(e)
+        finally:
+            self._finish(ticket)
+
+    def _finish(self, ticket):
+        with self._lock:
+            if self._inflight.get(ticket.key) is ticket:
+                del self._inflight[ticket.key]
+            if ticket.session is not None:
+                remaining = self._sessions.get(ticket.session, 1) - 1
+                if remaining > 0:
+                    self._sessions[ticket.session] = remaining
+                else:
+                    self._sessions.pop(ticket.session, None)
+
+    def position(self, ticket):
+        with self._lock:
+            try:
+                return self._waiting.index(ticket) + 1
+            except ValueError:
+                return 0
+
+    def release(self, ticket):
+        with self._lock:
+            ticket.waiters -= 1
+            if ticket.waiters > 0 or ticket not in self._waiting:
+                return
+            self._waiting.remove(ticket)
+        ticket.future.set_exception(CancelledError())
+        self._finish(ticket)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'inflight': len(self._inflight),
+                'waiting': len(self._waiting),
+                'sessions': len(self._sessions),
+            }
+
+
+# 이미 계산된 값을 예약처럼 다룰 때 사용 (캐시 적중)
+class CompletedTicket(Ticket):
+    def __init__(self, value):
+        super().__init__(None, None, None)
+        self.future.set_result(value)
+
+    def position(self):
+        return 0
+
+    def release(self):
+        pass
@@ -0,0 +1,39 @@
+import uuid
+
+import streamlit as st
+
+import query
+
+
+# 🎫 세션 구분용 ID (검색 스케줄러의 세션별 대기 한도에 사용)
+def session_id():
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
+
+
+# 🔍 네 앱이 함께 쓰는 검색 실행 (검색 스케줄러를 거쳐 공용 쿼리 엔진에서 계산, 대기 중이면 순번 표시)
+# 세션당 대기 한도를 넘으면 경고를 띄우고 None 반환
+def run_search(path, spec, outputs):
+    return _run_scheduled(lambda session, on_wait: query.scheduled_query(path, spec, outputs, session, on_wait))
+
+
+# 📈 기간 비교 실행 (검색과 같은 스케줄러/대기 한도)
+def run_comparison(path, spec, previous_start, previous_end, outputs):
+    return _run_scheduled(lambda session, on_wait: query.scheduled_comparison(
+        path, spec, previous_start, previous_end, outputs, session, on_wait))
+
+
+def _run_scheduled(run):
+    status = st.empty()
+
+    def show_position(position):
+        status.info(f"⏳ 다른 검색이 끝나기를 기다리는 중입니다 (대기 순번 {position}번)" if position else "⌛ 검색 결과를 계산 중입니다...")
+
+    try:
+        return run(session_id(), show_position)
+    except query.QueueFullError as e:
+        st.warning(str(e))
+        return None
+    finally:
+        status.empty()
@@ -0,0 +1,311 @@
+import glob
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as pads
+
+try:
+    import duckdb
+except ImportError:
+    # 선택 의존성: 없으면 pandas 백엔드만 사용 가능
+    duckdb = None
+
+import catalog
+import dataset
+import exporter_index
+import profiling
+import query
+
+# 🦆 DuckDB 백엔드: 일별 집계 큐브를 DuckDB 데이터베이스 파일로 한 번 옮겨 두고 SQL 로 조회
+# - 원본 버전마다 .snapshot/<이름>.cube.<버전>.duckdb 를 만듦 (저장소는 월별 파티션 큐브 + 별칭을 합쳐서)
+#   버전마다 파일이 따로라서 검색 중인 예전 파일을 닫거나 덮어쓰지 않고 새 파일로 넘어감
+# - 선적일 순으로 저장되어 있어 날짜 조건은 블록 최솟값/최댓값으로 건너뜀, 나머지 조건과 GROUP BY 는 멀티 스레드 벡터 연산
+# - 요청된 집계를 GROUPING SETS 로 묶어서 데이터를 한 번만 훑음
+# - 기간 비교, 사이드바 선택지 목록, 수출자 이름 목록도 SQL 로 조회 → pandas 큐브를 메모리에 올리지 않음
+TABLE = 'cube'
+_GROUP_ID = '__group_id'
+_PERIOD = '__period'
+# 수출자 조건 목록을 커서에 등록하는 표 이름
+_EXPORTERS = '__exporters'
+
+_databases = {}
+_lock = threading.Lock()
+
+
+def _q(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def database_path(path, version):
+    return f"{os.path.splitext(dataset.snapshot_path(path, 'cube'))[0]}.{version}.duckdb"
+
+
+# 🧹 다른 버전의 데이터베이스 파일 정리 (아직 열려 있어서 지울 수 없으면 다음 교체 때 다시 시도)
+def _remove_stale(path, version):
+    current = database_path(path, version)
+    for file in glob.glob(glob.escape(os.path.splitext(dataset.snapshot_path(path, 'cube'))[0]) + '.*.duckdb'):
+        if file != current:
+            try:
+                os.remove(file)
+            except OSError:
+                pass
+
+
+def _database_version(target):
+    try:
+        connection = duckdb.connect(target, read_only=True)
+    except duckdb.Error:
+        return None
+    try:
+        return connection.execute("SELECT version FROM source_version").fetchone()[0]
+    except duckdb.Error:
+        return None
+    finally:
+        connection.close()
+
+
+def _plain_schema(schema):
+    # 파일마다 사전 인덱스 폭이 달라도 하나의 데이터셋으로 읽히도록 사전 컬럼은 문자열로 통일
+    fields = [pa.field(field.name, field.type.value_type if pa.types.is_dictionary(field.type) else field.type)
+              for field in schema]
+    return pa.schema(fields)
+
+
+def _cube_source(path):
+    # 저장소: 월별 파티션 큐브 파일 + 별칭 매핑 / 엑셀: 큐브 스냅샷 파일 (pandas 프레임으로 올리지 않고 파일을 바로 읽음)
+    if dataset.is_store(path):
+        months = sorted(dataset.read_manifest(path)['months'])
+        files = [os.path.join(dataset.partition_dir(path, month), 'cube.arrow') for month in months]
+        # 월마다 컨테이너수 정수 폭이 다를 수 있으므로 모든 파일의 스키마를 넓은 쪽으로 합침
+        schema = pa.unify_schemas([_plain_schema(pads.dataset(file, format='ipc').schema) for file in files],
+                                  promote_options='permissive')
+        return pads.dataset(files, format='ipc', schema=schema), dataset.read_aliases(path)
+
+    target = dataset.snapshot_path(path, 'cube')
+    version = dataset.source_version(path)
+    if dataset.snapshot_version(target) != version:
+        # 스냅샷이 없거나 오래됐으면 한 번 만들고 (저장에 실패했으면 만든 큐브를 그대로 사용)
+        cube = dataset.load_cube(path)
+        if dataset.snapshot_version(target) != version:
+            table = pa.Table.from_pandas(cube, preserve_index=False)
+            return pads.dataset(table.cast(_plain_schema(table.schema))), {}
+    return pads.dataset(target, format='ipc', schema=_plain_schema(pads.dataset(target, format='ipc').schema)), {}
+
+
+def _build(path, target, version):
+    source, aliases = _cube_source(path)
+    schema = source.schema
+    keys = [col for col in schema.names if col != dataset.COUNT_COLUMN]
+    # 정수 합계를 HUGEINT 로 넓히지 않도록 원래 타입 계열로 고정 (집계 속도)
+    count_type = 'BIGINT' if pa.types.is_integer(schema.field(dataset.COUNT_COLUMN).type) else 'DOUBLE'
+    exporter = _q(dataset.EXPORTER_COLUMN)
+    select = ', '.join(f"COALESCE(a.canonical, c.{exporter}) AS {exporter}" if col == dataset.EXPORTER_COLUMN else f"c.{_q(col)}"
+                       for col in keys)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    connection = duckdb.connect(tmp)
+    try:
+        connection.register('cube_source', source)
+        connection.register('exporter_aliases', pa.table({'alias': list(aliases), 'canonical': list(aliases.values())},
+                                                         schema=pa.schema([('alias', pa.string()), ('canonical', pa.string())])))
+        # 별칭은 대표 이름으로 바꿔서 다시 합산 (파티션 큐브는 별칭별로 집계되어 있음), 선적일 순으로 저장
+        connection.execute(
+            f"CREATE TABLE {TABLE} AS SELECT {select}, CAST(SUM(c.{_q(dataset.COUNT_COLUMN)}) AS {count_type}) AS {_q(dataset.COUNT_COLUMN)} "
+            f"FROM cube_source c LEFT JOIN exporter_aliases a ON c.{exporter} = a.alias "
+            f"GROUP BY ALL ORDER BY ALL NULLS LAST"
+        )
+        connection.execute("CREATE TABLE source_version AS SELECT ? AS version", [version])
+    finally:
+        connection.close()
+    # 다 만든 뒤 옮겨서 다른 프로세스가 만드는 중인 파일을 열지 않도록 함
+    # (다른 프로세스가 같은 버전을 먼저 만들어 열었으면 그 파일을 그대로 씀)
+    if _database_version(target) == version:
+        os.remove(tmp)
+    else:
+        os.replace(tmp, target)
+
+
+def _open(path, version):
+    target = database_path(path, version)
+    if _database_version(target) != version:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        _build(path, target, version)
+    return duckdb.connect(target, read_only=True)
+
+
+class DuckDBBackend:
+    name = 'duckdb'
+
+    def __init__(self, path):
+        if duckdb is None:
+            raise ImportError("DuckDB 백엔드를 쓰려면 duckdb 를 설치해 주세요. (pip install duckdb)")
+        self.path = path
+
+    # 캐시 키에 쓰는 데이터 버전 (pandas 백엔드와 같은 모양)
+    def version(self):
+        return (os.path.abspath(self.path), dataset.source_version(self.path))
+
+    # 검색마다 별도 커서 → 여러 스레드에서 동시에 검색 가능
+    def _cursor(self):
+        key, version = self.version()
+        with _lock:
+            entry = _databases.get(key)
+            if entry is None or entry[0] != version:
+                # 원본이 바뀜: 예전 연결은 닫지 않고 놓기만 함 (다른 스레드의 커서가 아직 쓰는 중일 수 있음,
+                # 마지막 커서가 닫히면 함께 정리됨)
+                entry = (version, _open(self.path, version))
+                _databases[key] = entry
+                _remove_stale(self.path, version)
+            return entry[1].cursor()
+
+    def load(self):
+        self._cursor().close()
+
+    # 🧹 선적일 구간(들) + 선적항/도착지국가/도착항/수출자 조건 (수출자 목록은 커서에 표로 등록해서 조인)
+    def _conditions(self, cursor, spec, periods):
+        day = _q(dataset.DAY_COLUMN)
+        conditions = ['(' + ' OR '.join(f"{day} BETWEEN ? AND ?" for _ in periods) + ')',
+                      f"{_q(dataset.EXPORTER_COLUMN)} IS NOT NULL"]
+        params = [dataset.day_number(value) for period in periods for value in period]
+        for field, col in query._FILTERS:
+            value = getattr(spec, field)
+            if value != 'All':
+                conditions.append(f"{_q(col)} = ?")
+                params.append(value)
+        if spec.exporters:
+            cursor.register(_EXPORTERS, pa.table({'name': pa.array(spec.exporters, pa.string())}))
+            conditions.append(f"{_q(dataset.EXPORTER_COLUMN)} IN (SELECT name FROM {_EXPORTERS})")
+        return conditions, params
+
+    # 요청된 집계를 GROUPING SETS 하나로 계산한 뒤 결과 이름별로 나눔
+    def _group(self, cursor, filtered, params, names, aggregates, stage_name):
+        columns = sorted({col for name in names for col in query.OUTPUTS[name]})
+        sets = ', '.join('(' + ', '.join(_q(col) for col in query.OUTPUTS[name]) + ')' for name in names)
+        # 합계는 표의 컨테이너수 타입 그대로 (정수 BIGINT / 소수가 있으면 DOUBLE)
+        count_type = _column_types(cursor)[dataset.COUNT_COLUMN]
+        values = ', '.join(f"CAST({expr} AS {count_type}) AS {_q(alias)}" for expr, alias in aggregates)
+        with profiling.stage(stage_name) as stage:
+            table = cursor.execute(
+                f"SELECT {', '.join(_q(col) for col in columns)}, {values}, "
+                f"GROUPING({', '.join(_q(col) for col in columns)}) AS {_GROUP_ID} "
+                f"FROM ({filtered}) GROUP BY GROUPING SETS ({sets})",
+                params,
+            ).to_arrow_table()
+            stage.rows_out = len(table)
+        return {name: _split(table, columns, query.OUTPUTS[name], [alias for _, alias in aggregates]) for name in names}
+
+    def run_query(self, spec, outputs):
+        cursor = self._cursor()
+        try:
+            conditions, params = self._conditions(cursor, spec, [(spec.start_date, spec.end_date)])
+            filtered = f"SELECT * FROM {TABLE} WHERE {' AND '.join(conditions)}"
+            if spec.min_containers > 0:
+                # 조건을 만족하는 행의 수출자별 합계로 최소 컨테이너 수 판정
+                filtered += f" QUALIFY SUM({_q(dataset.COUNT_COLUMN)}) OVER (PARTITION BY {_q(dataset.EXPORTER_COLUMN)}) >= ?"
+                params.append(spec.min_containers)
+
+            names = [name for name in outputs if name in query.OUTPUTS]
+            if not names:
+                return {}
+            return self._group(cursor, filtered, params, names,
+                               [(f"SUM({_q(dataset.COUNT_COLUMN)})", dataset.COUNT_COLUMN)], 'sql:group_by')
+        finally:
+            cursor.close()
+
+    # 📈 기간 비교: 두 기간의 행에 기간 라벨을 붙여 한 번만 훑고 그룹별 이전/현재 합계를 함께 계산
+    def run_comparison(self, spec, previous_start, previous_end, outputs):
+        previous_start, previous_end = query.comparison_period(spec, previous_start, previous_end)
+        cursor = self._cursor()
+        try:
+            conditions, params = self._conditions(cursor, spec, [(spec.start_date, spec.end_date), (previous_start, previous_end)])
+            day, count = _q(dataset.DAY_COLUMN), _q(dataset.COUNT_COLUMN)
+            filtered = (f"SELECT *, CASE WHEN {day} BETWEEN ? AND ? THEN {query._CURRENT} ELSE {query._PREVIOUS} END AS {_PERIOD} "
+                        f"FROM {TABLE} WHERE {' AND '.join(conditions)}")
+            params = [dataset.day_number(spec.start_date), dataset.day_number(spec.end_date)] + params
+
+            def period_sum(period, window=''):
+                return f"SUM(CASE WHEN {_PERIOD} = {period} THEN {count} ELSE 0 END){window}"
+
+            if spec.min_containers > 0:
+                # 최소 컨테이너 수는 기간별 수출자 합계 중 큰 값으로 판정
+                window = f" OVER (PARTITION BY {_q(dataset.EXPORTER_COLUMN)})"
+                filtered = (f"SELECT * FROM ({filtered}) "
+                            f"QUALIFY GREATEST({period_sum(query._CURRENT, window)}, {period_sum(query._PREVIOUS, window)}) >= ?")
+                params.append(spec.min_containers)
+
+            aggregates = [(period_sum(query._PREVIOUS), query.PREVIOUS_COLUMN), (period_sum(query._CURRENT), query.CURRENT_COLUMN)]
+            tables = self._group(cursor, filtered, params, list(dict.fromkeys(outputs)), aggregates, 'sql:compare')
+            return {name: query.add_comparison_columns(table) for name, table in tables.items()}
+        finally:
+            cursor.close()
+
+    def _distinct(self, cursor, columns):
+        return cursor.execute(
+            f"SELECT DISTINCT {', '.join(_q(col) for col in columns)} FROM {TABLE} "
+            f"WHERE {' AND '.join(_q(col) + ' IS NOT NULL' for col in columns)}"
+        ).fetchall()
+
+    # 📚 사이드바 선택지 목록: 날짜 범위와 고유 값만 SQL 로 조회
+    def catalog(self):
+        return dataset.shared(self.path, 'catalog', lambda p: self._catalog())
+
+    def _catalog(self):
+        cursor = self._cursor()
+        try:
+            columns = _column_types(cursor)
+            date = _q(dataset.DATE_COLUMN)
+            min_date, max_date = cursor.execute(f"SELECT MIN({date}), MAX({date}) FROM {TABLE}").fetchone()
+            options = {col: [value for (value,) in self._distinct(cursor, [col])]
+                       for col in dataset.DIMENSION_COLUMNS if col in columns}
+            pairs = {(parent, child): self._distinct(cursor, [parent, child]) for parent, child in catalog.CATALOG_LINKS
+                     if parent in columns and child in columns}
+            return catalog.make_catalog(min_date, max_date, options, pairs)
+        finally:
+            cursor.close()
+
+    # 🔎 수출자 이름 색인 (이름 검색용, 수출자 조건 검색은 SQL 로 하므로 행 목록 없음)
+    def exporter_index(self):
+        return dataset.shared(self.path, 'exporter_names', lambda p: self._exporter_index())
+
+    def _exporter_index(self):
+        cursor = self._cursor()
+        try:
+            names = sorted(name for (name,) in self._distinct(cursor, [dataset.EXPORTER_COLUMN]))
+        finally:
+            cursor.close()
+        return exporter_index.ExporterIndex(names, aliases=dataset.exporter_aliases(self.path))
+
+
+def _column_types(cursor):
+    return {row[0]: row[1] for row in cursor.execute(f"DESCRIBE {TABLE}").fetchall()}
+
+
+def _split(table, columns, keys, values):
+    # GROUPING() 비트: 앞 컬럼이 높은 자리, 그룹 키에 없는 컬럼은 1
+    group_id = sum(1 << (len(columns) - 1 - i) for i, col in enumerate(columns) if col not in keys)
+    mask = pc.equal(table[_GROUP_ID], group_id)
+    for col in keys:
+        mask = pc.and_(mask, pc.is_valid(table[col]))
+    part = table.filter(mask).sort_by([(col, 'ascending') for col in keys])
+    result = {col: _categorical(part[col]) for col in keys}
+    for col in values:
+        result[col] = part[col].to_numpy()
+    return pd.DataFrame(result)
+
+
+def _categorical(column):
+    # 문자열 → 정렬된 사전의 카테고리 (pandas 백엔드 결과와 같은 dtype 계열, 문자열 객체를 만들지 않음)
+    encoded = pc.dictionary_encode(column).combine_chunks()
+    dictionary = encoded.dictionary
+    order = pc.sort_indices(dictionary).to_numpy()
+    recode = np.empty(len(order), dtype=np.int64)
+    recode[order] = np.arange(len(order))
+    # 결측은 코드 -1
+    codes = encoded.indices.fill_null(-1).to_numpy(zero_copy_only=False)
+    codes = np.where(codes >= 0, recode[np.maximum(codes, 0)], -1)
+    return pd.Categorical.from_codes(codes, pd.Index(dictionary.take(order).to_pylist()))
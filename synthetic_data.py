@@ -0,0 +1,137 @@
+import argparse
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import dataset
+
+# 📏 벤치마크용 표준 크기
+SIZES = {'100k': 100_000, '1m': 1_000_000, '10m': 10_000_000, '50m': 50_000_000}
+# 엑셀 한 시트의 최대 데이터 행 수
+EXCEL_MAX_ROWS = 1_048_575
+
+LOADING_PORTS = ['부산', '인천', '광양', '평택', '울산']
+LOADING_PORT_WEIGHTS = [0.62, 0.14, 0.11, 0.08, 0.05]
+COUNTRY_PORTS = {
+    '중국': ['상하이', '칭다오', '닝보', '톈진', '선전', '다롄', '샤먼'],
+    '미국': ['LA', '롱비치', '뉴욕', '사바나', '시애틀', '휴스턴', '오클랜드'],
+    '베트남': ['하이퐁', '호치민', '다낭'],
+    '일본': ['도쿄', '오사카', '요코하마', '나고야', '고베', '하카타'],
+    '인도': ['나바셰바', '첸나이', '문드라'],
+    '멕시코': ['만사니요', '라사로카르데나스'],
+    '인도네시아': ['자카르타', '수라바야'],
+    '태국': ['램차방', '방콕'],
+    '대만': ['가오슝', '타이중', '지룽'],
+    '독일': ['함부르크', '브레머하펜'],
+    '네덜란드': ['로테르담'],
+    '호주': ['시드니', '멜버른', '브리즈번'],
+    '브라질': ['산투스', '파라나구아'],
+    '사우디아라비아': ['제다', '담맘'],
+    '튀르키예': ['메르신', '이스탄불'],
+}
+CARRIERS = ['HMM', 'MAERSK', 'MSC', 'CMA CGM', 'COSCO', 'EVERGREEN', 'ONE', 'HAPAG-LLOYD',
+            'YANG MING', 'ZIM', 'SM상선', '고려해운', '장금상선', '흥아라인', '팬오션', '남성해운']
+_KOREAN_SUFFIXES = ['(주)', ' 주식회사', '', '(유)']
+_LATIN_SUFFIXES = [' CO., LTD', ' CORP.', ' INC.', '']
+
+
+def _zipf(n, s, rng):
+    # 순위 s 제곱에 반비례하는 인기도를 무작위 순서로 배정 (이름 순서와 인기도가 무관하도록)
+    weights = 1.0 / np.arange(1, n + 1) ** s
+    return rng.permutation(weights / weights.sum())
+
+
+def exporter_names(count):
+    names = []
+    for i in range(count):
+        if i % 3 == 2:
+            names.append(f"KOREA TRADING {i:06d}{_LATIN_SUFFIXES[i % len(_LATIN_SUFFIXES)]}")
+        else:
+            names.append(f"한국상사{i:06d}{_KOREAN_SUFFIXES[i % len(_KOREAN_SUFFIXES)]}")
+    return sorted(names)
+
+
+def _categorical(codes, categories):
+    return pd.Categorical.from_codes(codes, categories=pd.Index(categories))
+
+
+# 🧪 실제 스키마와 같은 합성 선적 데이터 (dataset.normalize_frame 결과와 같은 타입, 선적일 순 정렬)
+# - 수출자/선사/국가는 Zipf 분포 (상위 소수가 대부분의 물량)
+# - 도착항은 국가별로 앞쪽 항구에 몰리도록 치우침
+# - 컨테이너수는 1 + 기하분포 (대부분 소량, 드물게 대량)
+def generate(rows, seed=0, start_date='2021-01-01', days=4 * 365, exporters=None):
+    rng = np.random.default_rng(seed)
+    exporter_count = exporters or int(min(200_000, max(100, rows // 50)))
+
+    countries = sorted(COUNTRY_PORTS)
+    country_codes = rng.choice(len(countries), rows, p=_zipf(len(countries), 1.2, rng))
+    port_names = sorted({port for ports in COUNTRY_PORTS.values() for port in ports})
+    port_lookup = [[port_names.index(port) for port in COUNTRY_PORTS[country]] for country in countries]
+    port_counts = np.array([len(ports) for ports in port_lookup])
+    local_ports = (rng.random(rows) ** 2 * port_counts[country_codes]).astype(np.int64)
+    port_table = np.full((len(countries), port_counts.max()), -1)
+    for i, ports in enumerate(port_lookup):
+        port_table[i, :len(ports)] = ports
+    port_codes = port_table[country_codes, local_ports]
+
+    loading_names = sorted(LOADING_PORTS)
+    loading_weights = np.array([LOADING_PORT_WEIGHTS[LOADING_PORTS.index(name)] for name in loading_names])
+    carrier_names = sorted(CARRIERS)
+
+    day_numbers = np.sort(dataset.day_number(start_date) + rng.integers(0, days, rows)).astype(np.int32)
+    df = pd.DataFrame({
+        dataset.DATE_COLUMN: pd.to_datetime(day_numbers.astype(np.int64), unit='D'),
+        '선적항': _categorical(rng.choice(len(loading_names), rows, p=loading_weights), loading_names),
+        '도착지국가': _categorical(country_codes, countries),
+        '도착항': _categorical(port_codes, port_names),
+        '수출자': _categorical(rng.choice(exporter_count, rows, p=_zipf(exporter_count, 1.1, rng)), exporter_names(exporter_count)),
+        '컨테이너선사': _categorical(rng.choice(len(carrier_names), rows, p=_zipf(len(carrier_names), 0.9, rng)), carrier_names),
+        dataset.COUNT_COLUMN: np.minimum(rng.geometric(0.35, rows), 200).astype(np.int16),
+        dataset.DAY_COLUMN: day_numbers,
+    })
+    df[dataset.COUNT_COLUMN] = pd.to_numeric(df[dataset.COUNT_COLUMN], downcast='integer')
+    return df
+
+
+# 📝 원본 엑셀과 같은 모양으로 저장 (write_only 모드라 메모리 사용량이 일정)
+def write_excel(df, path):
+    if len(df) > EXCEL_MAX_ROWS:
+        raise ValueError(f"엑셀 한 시트에는 {EXCEL_MAX_ROWS}행까지만 저장할 수 있습니다.")
+    columns = [col for col in df.columns if col != dataset.DAY_COLUMN]
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(columns)
+    arrays = [df[col].dt.to_pydatetime() if col == dataset.DATE_COLUMN else df[col].to_numpy().tolist() for col in columns]
+    for row in zip(*arrays):
+        sheet.append(row)
+    workbook.save(path)
+
+
+def write_arrow(df, path):
+    feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), path, compression='uncompressed')
+
+
+def parse_size(text):
+    return SIZES.get(text.lower()) or int(text.replace('_', ''))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="실제 스키마와 같은 합성 선적 데이터를 만듭니다.")
+    parser.add_argument('size', help=f"행 수 ({' / '.join(SIZES)} 또는 숫자)")
+    parser.add_argument('out', help="저장 경로 (.xlsx 또는 .arrow)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    df = generate(parse_size(args.size), args.seed)
+    if args.out.endswith('.xlsx'):
+        write_excel(df, args.out)
+    else:
+        write_arrow(df, args.out)
+    print(f"✅ {len(df):,}행 → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import dataset
+import query
+
+# 🧪 기간 비교: 이전 기간 1월, 현재 기간 2월 (3월 행은 어느 기간에도 들지 않음)
+PREVIOUS = ('2024-01-01', '2024-01-31')
+CURRENT = ('2024-02-01', '2024-02-29')
+
+# 수출자 → (1월, 2월, 3월) 컨테이너수
+VOLUMES = {
+    '증가상사': (10, 15, 100),
+    '이탈상사': (8, 0, 0),
+    '신규상사': (0, 4, 0),
+    '유지상사': (6, 6, 0),
+    '감소상사': (30, 5, 0),
+}
+
+
+@pytest.fixture(scope='module')
+def cube():
+    records = []
+    for exporter, counts in VOLUMES.items():
+        for day, count in zip(['2024-01-15', '2024-02-15', '2024-03-15'], counts):
+            if count:
+                records.append({'선적일': pd.Timestamp(day), '선적항': '부산', '도착지국가': '중국', '도착항': '상해',
+                                '수출자': exporter, '컨테이너선사': 'HMM', '컨테이너수': count})
+    df = pd.DataFrame(records)
+    df = df.astype({col: 'category' for col in dataset.DIMENSION_COLUMNS})
+    df[dataset.DAY_COLUMN] = dataset.to_day_numbers(df['선적일'])
+    return dataset.build_cube(df)
+
+
+def _compare(cube, min_containers=0):
+    spec = query.make_spec(*CURRENT, min_containers=min_containers)
+    table = query.run_comparison(cube, spec, *PREVIOUS, ['exporters'])['exporters']
+    return table.astype({'수출자': str}).set_index('수출자')
+
+
+def test_comparison_labels_periods_and_computes_deltas(cube):
+    table = _compare(cube)
+    assert table[query.PREVIOUS_COLUMN].to_dict() == {name: counts[0] for name, counts in VOLUMES.items()}
+    assert table[query.CURRENT_COLUMN].to_dict() == {name: counts[1] for name, counts in VOLUMES.items()}
+    assert table[query.DELTA_COLUMN].to_dict() == {name: counts[1] - counts[0] for name, counts in VOLUMES.items()}
+    assert table.loc['증가상사', query.GROWTH_COLUMN] == 50.0
+    assert np.isnan(table.loc['신규상사', query.GROWTH_COLUMN])
+    assert table[query.STATUS_COLUMN].to_dict() == {
+        '증가상사': '증가', '이탈상사': '이탈', '신규상사': '신규', '유지상사': '유지', '감소상사': '감소',
+    }
+
+
+def test_min_containers_uses_the_larger_period_total(cube):
+    # 감소상사는 현재 기간 5개지만 이전 기간 30개라 남고, 3월 물량은 판정에 쓰지 않음
+    assert sorted(_compare(cube, 10).index) == ['감소상사', '증가상사']
+
+
+def test_overlapping_periods_are_rejected(cube):
+    spec = query.make_spec(*CURRENT)
+    with pytest.raises(ValueError):
+        query.run_comparison(cube, spec, '2024-01-15', '2024-02-01', ['exporters'])
+
+
+def test_duckdb_comparison_matches_pandas(cube, tmp_path):
+    pytest.importorskip('duckdb')
+    path = str(tmp_path / 'compare.xlsx')
+    open(path, 'wb').close()
+    dataset.write_snapshot(dataset.snapshot_path(path, 'cube'), dataset.source_version(path), cube)
+    spec = query.make_spec(*CURRENT, min_containers=10)
+    table = query.get_backend(path, 'duckdb').run_comparison(spec, *PREVIOUS, ['exporters'])['exporters']
+    pd.testing.assert_frame_equal(table.astype({'수출자': str}).set_index('수출자'), _compare(cube, 10), check_dtype=False)
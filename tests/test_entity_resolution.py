@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import dataset
+import entity_resolution
+import query
+import synthetic_data
+
+
+def test_legal_form_variants_merge_to_heaviest_name():
+    names = ['삼성전자(주)', '삼성전자 주식회사', 'SAMSUNG ELECTRONICS CO., LTD']
+    mapping = entity_resolution.resolve(names, {'삼성전자(주)': 5, '삼성전자 주식회사': 20})
+    assert mapping == {'삼성전자(주)': '삼성전자 주식회사'}
+
+
+def test_different_digits_or_letter_suffix_stay_separate():
+    assert entity_resolution.resolve(['수출사1', '수출사10']) == {}
+    assert entity_resolution.resolve(['ABC TRADING A', 'ABC TRADING B']) == {}
+
+
+def test_spacing_variants_merge():
+    assert entity_resolution.resolve(['한국무역상사.', '한국 무역상사'], {'한국 무역상사': 3}) == {'한국무역상사.': '한국 무역상사'}
+
+
+def test_override_renames_and_keep_separate():
+    names = ['GLOBAL LOGISTICS KOREA', 'GLOBAL LOGISTIC KOREA', '글로벌로지스']
+    overrides = {'글로벌로지스': 'GLOBAL LOGISTICS KOREA', 'GLOBAL LOGISTIC KOREA': 'GLOBAL LOGISTIC KOREA'}
+    mapping = entity_resolution.resolve(names, {'GLOBAL LOGISTIC KOREA': 10}, overrides)
+    # 따로 유지로 지정한 이름은 비슷해도 합치지 않고, 수동 별칭은 그대로 적용
+    assert mapping == {'글로벌로지스': 'GLOBAL LOGISTICS KOREA'}
+
+
+def test_read_overrides(tmp_path):
+    path = tmp_path / entity_resolution.OVERRIDES_NAME
+    path.write_text('alias,canonical\n"ACME, INC",ACME\nABC TRADING A,ABC TRADING A\n,빈값\n', encoding='utf-8-sig')
+    assert entity_resolution.read_overrides(str(path)) == {'ACME, INC': 'ACME', 'ABC TRADING A': 'ABC TRADING A'}
+
+
+def test_merged_alias_finds_canonical_exporter(tmp_path):
+    df = synthetic_data.generate(40, seed=1, exporters=5)
+    names = np.where(np.arange(len(df)) < 5, '삼성전자(주)', '삼성전자 주식회사')
+    df['수출자'] = pd.Categorical(names)
+    path = str(tmp_path / 'aliases.xlsx')
+    synthetic_data.write_excel(df, path)
+
+    assert dataset.exporter_aliases(path) == {}
+    dataset.load_frame(path)
+    assert dataset.exporter_aliases(path) == {'삼성전자(주)': '삼성전자 주식회사'}
+    # 별칭으로 찾아도 대표 이름 하나만
+    assert query.get_backend(path, 'pandas').exporter_index().search_names('삼성전자(주)') == ['삼성전자 주식회사']
+    pytest.importorskip('duckdb')
+    assert query.get_backend(path, 'duckdb').exporter_index().search_names('삼성전자(주)') == ['삼성전자 주식회사']
@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+
+import dataset
+import exporter_index
+
+# 수출자 → 선적일 목록 (하루 1개씩)
+SHIPMENTS = {
+    'ABC Trading': ['2024-01-05', '2024-02-10'],
+    'abc LOGISTICS': ['2024-01-20'],
+    '삼성전자': ['2024-01-03', '2024-01-25', '2024-03-01'],
+    '삼성물산': ['2024-02-14'],
+    '한국상사': ['2024-01-10'],
+}
+
+
+@pytest.fixture(scope='module')
+def cube():
+    records = [{'선적일': pd.Timestamp(day), '선적항': '부산', '도착지국가': '중국', '도착항': '상해',
+                '수출자': name, '컨테이너선사': 'HMM', '컨테이너수': 1}
+               for name, days in SHIPMENTS.items() for day in days]
+    df = pd.DataFrame(records).astype({col: 'category' for col in dataset.DIMENSION_COLUMNS})
+    df[dataset.DAY_COLUMN] = dataset.to_day_numbers(df['선적일'])
+    return dataset.build_cube(df)
+
+
+@pytest.fixture(scope='module')
+def index(cube):
+    return exporter_index.build_index(cube)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('abc', ['ABC Trading', 'abc LOGISTICS']),
+    ('LOGIS', ['abc LOGISTICS']),
+    ('  Trading ', ['ABC Trading']),
+    ('삼', ['삼성물산', '삼성전자']),
+    ('성전', ['삼성전자']),
+    ('없는회사', []),
+    ('', []),
+])
+def test_search_ignores_case(index, text, expected):
+    assert sorted(index.search_names(text)) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('ㅅㅅㅈㅈ', ['삼성전자']),
+    ('ㅅㅅ ㅁㅅ', ['삼성물산']),
+    ('ㅅㅅ', ['삼성물산', '삼성전자', '한국상사']),
+])
+def test_search_by_initial_consonants(index, text, expected):
+    assert sorted(index.search_names(text)) == expected
+
+
+def test_rows_are_limited_to_the_date_range(cube, index):
+    ids = index.search('삼성전자')
+    assert len(index.rows(cube, ids)) == 3
+    rows = index.rows(cube, ids, '2024-01-03', '2024-01-31')
+    assert rows['선적일'].dt.strftime('%Y-%m-%d').tolist() == ['2024-01-03', '2024-01-25']
+    # 선적일 순서 유지 (여러 수출자를 합쳐도 정렬된 큐브의 행 순서)
+    rows = index.rows(cube, index.search('abc'), '2024-01-01', '2024-01-31')
+    assert rows['수출자'].astype(str).tolist() == ['ABC Trading', 'abc LOGISTICS']
+
+
+def test_name_only_index_has_no_rows(cube):
+    index = exporter_index.ExporterIndex(sorted(SHIPMENTS))
+    assert index.search_names('abc') == ['ABC Trading', 'abc LOGISTICS']
+    with pytest.raises(ValueError):
+        index.rows(cube, index.search('abc'))
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+import dataset
+import ingest
+import synthetic_data
+
+
+def _month(rows, seed, start_date='2024-01-01', days=31):
+    return synthetic_data.generate(rows, seed=seed, start_date=start_date, days=days, exporters=20)
+
+
+def _write(df, path):
+    synthetic_data.write_excel(df, str(path))
+    return str(path)
+
+
+def test_same_file_is_skipped_and_new_file_replaces_its_month(tmp_path):
+    store = str(tmp_path / 'store')
+    first = _month(40, 1)
+    path = _write(first, tmp_path / '202401.xlsx')
+    assert ingest.ingest_files([path], store) == ['202401']
+    assert ingest.ingest_files([path], store) == []
+
+    # 같은 달 파일을 새로 받으면 그 달 파티션만 교체
+    february = _write(_month(30, 2, '2024-02-01', 29), tmp_path / '202402.xlsx')
+    assert ingest.ingest_files([february], store) == ['202402']
+    second = _month(25, 3)
+    path = _write(second, tmp_path / '202401.xlsx')
+    assert ingest.ingest_files([path], store) == ['202401']
+
+    manifest = dataset.read_manifest(store)
+    assert sorted(manifest['months']) == ['202401', '202402']
+    assert manifest['months']['202401']['rows'] == len(second)
+    cube = dataset.load_cube(store)
+    january = dataset.date_slice(cube, '2024-01-01', '2024-01-31')
+    assert january['컨테이너수'].sum() == second['컨테이너수'].sum()
+
+
+def test_file_without_month_in_name_is_skipped_by_source(tmp_path):
+    store = str(tmp_path / 'store')
+    path = _write(_month(20, 4), tmp_path / 'january.xlsx')
+    assert ingest.ingest_files([path], store) == ['202401']
+    assert ingest.ingest_files([path], store) == []
+
+
+def test_rows_outside_the_month_are_rejected(tmp_path):
+    store = str(tmp_path / 'store')
+    path = _write(_month(40, 5, '2024-01-20', 30), tmp_path / '202401.xlsx')
+    with pytest.raises(ValueError):
+        ingest.ingest_files([path], store)
+    assert not os.path.exists(dataset.partition_dir(store, '202401'))
+
+
+def test_detected_duplicate_months_replace_nothing(tmp_path):
+    store = str(tmp_path / 'store')
+    paths = [_write(_month(20, seed), tmp_path / name) for seed, name in [(6, 'a.xlsx'), (7, 'b.xlsx')]]
+    with pytest.raises(ValueError):
+        ingest.ingest_files(paths, store, workers=1)
+    # 임시 파티션도 남기지 않음
+    assert os.listdir(store) == []
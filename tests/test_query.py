@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import dataset
+import query
+import ranking
+import synthetic_data
+
+# 🧪 최적화된 검색 경로 (run_query / top_ranked / DuckDB) 를 원래 앱의 filter_data + groupby + rank 와 비교
+START, END = '2024-01-01', '2024-04-30'
+
+SPECS = [
+    {},
+    {'start_date': '2024-02-03', 'end_date': '2024-02-20'},
+    {'loading_port': '부산'},
+    {'arrival_country': '중국', 'min_containers': 20},
+    {'loading_port': '인천', 'arrival_country': '미국', 'arrival_port': 'LA'},
+    {'arrival_port': '없는항구'},
+    {'min_containers': 50},
+    {'start_date': '2024-03-01', 'end_date': '2024-03-01', 'min_containers': 3},
+]
+
+
+@pytest.fixture(scope='module')
+def rows():
+    df = synthetic_data.generate(6000, seed=7, start_date=START, days=120, exporters=150)
+    # 수출자/선사가 비어 있는 행도 섞음
+    rng = np.random.default_rng(7)
+    df.loc[rng.choice(len(df), 60, replace=False), '수출자'] = np.nan
+    df.loc[rng.choice(len(df), 60, replace=False), '컨테이너선사'] = np.nan
+    return df
+
+
+def _spec(params):
+    return query.make_spec(params.get('start_date', START), params.get('end_date', END),
+                           params.get('loading_port', 'All'), params.get('arrival_country', 'All'),
+                           params.get('arrival_port', 'All'), params.get('min_containers', 0))
+
+
+# 원래 앱의 filter_data (문자열 컬럼 + 불리언 마스크 + isin)
+def _filter_data(df, spec):
+    df = df.astype({col: object for col in dataset.DIMENSION_COLUMNS})
+    df = df[(df['선적일'] >= pd.to_datetime(spec.start_date)) & (df['선적일'] <= pd.to_datetime(spec.end_date))]
+    if spec.loading_port != 'All':
+        df = df[df['선적항'] == spec.loading_port]
+    if spec.arrival_country != 'All':
+        df = df[df['도착지국가'] == spec.arrival_country]
+    if spec.arrival_port != 'All':
+        df = df[df['도착항'] == spec.arrival_port]
+    grouped = df.groupby('수출자').agg({'컨테이너수': 'sum'}).reset_index()
+    grouped = grouped[grouped['컨테이너수'] >= spec.min_containers]
+    return df[df['수출자'].isin(grouped['수출자'])]
+
+
+def _expected(filtered, keys):
+    grouped = filtered.groupby(keys).agg({'컨테이너수': 'sum'}).reset_index()
+    grouped['컨테이너수'] = grouped['컨테이너수'].astype(np.int64)
+    return grouped
+
+
+def _plain(table, keys):
+    table = table.astype({col: object for col in keys}).reset_index(drop=True)
+    table['컨테이너수'] = table['컨테이너수'].astype(np.int64)
+    return table[keys + ['컨테이너수']]
+
+
+def _assert_outputs(results, filtered):
+    for name, keys in query.OUTPUTS.items():
+        pd.testing.assert_frame_equal(_plain(results[name], keys), _expected(filtered, keys), check_dtype=False)
+
+
+@pytest.mark.parametrize('params', SPECS)
+def test_run_query_matches_filter_data(rows, params):
+    spec = _spec(params)
+    filtered = _filter_data(rows, spec)
+    # 원본 행 / 일별 집계 큐브 어느 쪽에서 계산해도 같은 결과
+    _assert_outputs(query.run_query(rows, spec, list(query.OUTPUTS)), filtered)
+    _assert_outputs(query.run_query(dataset.build_cube(rows), spec, list(query.OUTPUTS)), filtered)
+
+
+@pytest.mark.parametrize('limit', [None, 1, 5, 17, 10_000])
+def test_top_ranked_matches_rank_min(rows, limit):
+    exporters = query.run_query(rows, _spec({}), ['exporters'])['exporters']
+    ranked = ranking.top_ranked(exporters, '수출자', limit)
+
+    expected = _expected(_filter_data(rows, _spec({})), ['수출자'])
+    expected['순위'] = expected['컨테이너수'].rank(ascending=False, method='min').astype(np.int64)
+    # 같은 값은 이름 순 (정렬 안정성)
+    expected = expected.sort_values('컨테이너수', ascending=False, kind='stable')
+    if limit is not None:
+        expected = expected.head(limit)
+    pd.testing.assert_frame_equal(_plain(ranked, ['수출자']).assign(순위=ranked['순위'].to_numpy()),
+                                  expected[['수출자', '컨테이너수', '순위']].reset_index(drop=True), check_dtype=False)
+
+
+def test_ranked_tables_carry_only_their_own_categories(rows):
+    exporters = query.run_query(rows, _spec({'loading_port': '부산'}), ['exporters'])['exporters']
+    assert len(exporters['수출자'].cat.categories) == len(exporters)
+    ranked = ranking.top_ranked(exporters, '수출자', 5)
+    assert sorted(ranked['수출자'].cat.categories) == sorted(ranked['수출자'].astype(str))
+
+
+@pytest.fixture(scope='module')
+def duckdb_source(rows, tmp_path_factory):
+    pytest.importorskip('duckdb')
+    # 엑셀 파싱 없이 큐브 스냅샷을 직접 만들어 두면 두 백엔드 모두 그 스냅샷에서 읽음
+    path = str(tmp_path_factory.mktemp('data') / 'synthetic.xlsx')
+    open(path, 'wb').close()
+    dataset.write_snapshot(dataset.snapshot_path(path, 'cube'), dataset.source_version(path), dataset.build_cube(rows))
+    return path
+
+
+@pytest.mark.parametrize('params', SPECS)
+def test_duckdb_backend_matches_filter_data(rows, duckdb_source, params):
+    spec = _spec(params)
+    results = query.get_backend(duckdb_source, 'duckdb').run_query(spec, list(query.OUTPUTS))
+    _assert_outputs(results, _filter_data(rows, spec))
+
+
+def test_fractional_counts_keep_their_sums(rows, tmp_path):
+    halves = rows.assign(컨테이너수=rows['컨테이너수'] * 0.5)
+    spec = _spec({'min_containers': 20})
+    expected = _filter_data(halves, spec).groupby('수출자').agg({'컨테이너수': 'sum'}).reset_index()
+
+    path = str(tmp_path / 'halves.xlsx')
+    open(path, 'wb').close()
+    cube = dataset.build_cube(halves)
+    dataset.write_snapshot(dataset.snapshot_path(path, 'cube'), dataset.source_version(path), cube)
+    results = [query.run_query(cube, spec, ['exporters'])]
+    try:
+        import duckdb  # noqa: F401
+        results.append(query.get_backend(path, 'duckdb').run_query(spec, ['exporters']))
+    except ImportError:
+        pass
+
+    for result in results:
+        exporters = result['exporters'].astype({'수출자': object}).reset_index(drop=True)
+        assert exporters['컨테이너수'].dtype == np.float64
+        pd.testing.assert_frame_equal(exporters, expected, check_dtype=False)
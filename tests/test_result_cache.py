@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+import result_cache
+
+
+def _frame(rows):
+    return pd.DataFrame({'컨테이너수': np.zeros(rows, dtype=np.int64)})
+
+
+def test_least_recently_used_entries_are_evicted_by_size():
+    size = result_cache.estimate_size(_frame(100))
+    cache = result_cache.ResultCache(size * 2)
+    cache.put(('data', 'v1', 'a'), _frame(100))
+    cache.put(('data', 'v1', 'b'), _frame(100))
+    # a 를 최근에 쓴 것으로 만들면 다음에 넣을 때 b 가 빠짐
+    assert cache.get(('data', 'v1', 'a')) is not None
+    cache.put(('data', 'v1', 'c'), _frame(100))
+
+    assert cache.get(('data', 'v1', 'b')) is None
+    assert cache.get(('data', 'v1', 'a')) is not None
+    assert cache.stats()['entries'] == 2 and cache.stats()['bytes'] == size * 2
+
+    # 용량보다 큰 결과는 넣지 않음
+    cache.put(('data', 'v1', 'big'), _frame(1000))
+    assert cache.get(('data', 'v1', 'big')) is None
+    assert cache.stats()['entries'] == 2
+
+
+def test_new_version_drops_results_of_the_old_version():
+    cache = result_cache.ResultCache(1 << 20)
+    cache.put(('data', 'v1', 'a'), _frame(10))
+    cache.put(('other', 'v1', 'a'), _frame(10))
+    assert cache.get(('data', 'v2', 'a')) is None
+
+    # 같은 데이터셋의 이전 버전 결과만 정리되고 다른 데이터셋은 그대로
+    assert cache.stats()['entries'] == 1
+    assert cache.get(('other', 'v1', 'a')) is not None
+    assert cache.get(('data', 'v1', 'a')) is None
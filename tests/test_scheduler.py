@@ -0,0 +1,73 @@
+import threading
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+import scheduler
+
+
+# 작업 스레드 하나를 gate 가 열릴 때까지 붙잡아 두는 계산
+def _blocking(gate, calls, value):
+    def compute():
+        calls.append(value)
+        gate.wait(5)
+        return value
+    return compute
+
+
+# 결과가 나온 직후 작업 스레드가 예약을 정리할 때까지 기다림
+def _settle(pool):
+    deadline = time.monotonic() + 5
+    while pool.stats()['inflight'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_same_key_shares_one_computation():
+    pool = scheduler.QueryScheduler(1, 3)
+    gate, calls = threading.Event(), []
+    first = pool.submit('a', _blocking(gate, calls, 1), 's1')
+    second = pool.submit('a', _blocking(gate, calls, 2), 's2')
+    assert second is first
+    gate.set()
+    assert first.result(5) == 1 and second.result(5) == 1
+    assert calls == [1]
+
+
+def test_released_waiting_ticket_is_cancelled():
+    pool = scheduler.QueryScheduler(1, 3)
+    gate, calls = threading.Event(), []
+    running = pool.submit('running', _blocking(gate, calls, 'running'))
+    queued = pool.submit('queued', _blocking(gate, calls, 'queued'))
+    assert queued.position() == 1
+
+    # 같은 예약을 기다리는 쪽이 남아 있으면 취소하지 않음
+    pool.submit('queued', _blocking(gate, calls, 'queued'))
+    queued.release()
+    assert not queued.done()
+    queued.release()
+    with pytest.raises(CancelledError):
+        queued.result(5)
+
+    gate.set()
+    assert running.result(5) == 'running'
+    assert calls == ['running']
+    _settle(pool)
+    assert pool.stats()['inflight'] == 0 and pool.stats()['waiting'] == 0
+
+
+def test_session_limit_counts_unfinished_searches():
+    pool = scheduler.QueryScheduler(1, 2)
+    gate, calls = threading.Event(), []
+    tickets = [pool.submit(key, _blocking(gate, calls, key), 's1') for key in ['a', 'b']]
+    with pytest.raises(scheduler.QueueFullError):
+        pool.submit('c', _blocking(gate, calls, 'c'), 's1')
+    # 다른 세션, 이미 예약된 같은 키는 한도와 무관
+    pool.submit('c', _blocking(gate, calls, 'c'), 's2')
+    assert pool.submit('a', _blocking(gate, calls, 'a'), 's1') is tickets[0]
+
+    gate.set()
+    for ticket in tickets:
+        ticket.result(5)
+    _settle(pool)
+    pool.submit('d', lambda: 'd', 's1').result(5)
@@ -0,0 +1,79 @@
+import threading
+import time
+
+import catalog
+import dataset
+import exporter_index
+import query
+
+# 🔥 백그라운드 예열 단계 (앞 단계 결과를 뒤 단계가 재사용)
+STEPS = [
+    ('cube', "검색 데이터 로드"),
+    ('catalog', "검색 조건 목록 생성"),
+    ('index', "수출자 이름 색인 생성"),
+    ('default_query', "기본 검색 결과 준비"),
+]
+
+_jobs = {}
+_lock = threading.Lock()
+
+
+def _run_step(path, step):
+    if step == 'cube':
+        # pandas: 일별 집계 큐브 / duckdb: 데이터베이스 파일
+        query.get_backend(path).load()
+    elif step == 'catalog':
+        catalog.shared_catalog(path)
+    elif step == 'index':
+        exporter_index.shared_index(path)
+    elif step == 'default_query':
+        # 로그인 직후 첫 화면의 기본 조건 (전체 기간, 모든 항구) 결과를 결과 캐시에 올려 둠
+        dim_catalog = catalog.shared_catalog(path)
+        spec = query.make_spec(dim_catalog['min_date'], dim_catalog['max_date'])
+        query.cached_query(path, spec, ('exporters', 'carriers'))
+
+
+def _worker(path, state):
+    state['started'] = time.time()
+    try:
+        for i, (step, label) in enumerate(STEPS):
+            state['step'] = label
+            _run_step(path, step)
+            state['done'] = i + 1
+    except Exception as e:
+        # 예열 실패는 앱에서 다시 로드할 때 오류로 드러나므로 상태에만 기록
+        state['error'] = e
+    finally:
+        state['elapsed'] = time.time() - state['started']
+        state['finished'] = True
+
+
+# 🚀 프로세스당 한 번 예열 스레드 시작 (원본 버전이 바뀌어 끝난 작업은 다시 시작)
+def start(path):
+    with _lock:
+        state = _jobs.get(path)
+        if state is not None:
+            if not state['finished'] or state['version'] == _version(path):
+                return state
+        state = {
+            'version': _version(path),
+            'total': len(STEPS),
+            'done': 0,
+            'step': None,
+            'error': None,
+            'finished': False,
+        }
+        _jobs[path] = state
+        threading.Thread(target=_worker, args=(path, state), name='dataset-warmup', daemon=True).start()
+        return state
+
+
+def _version(path):
+    try:
+        return dataset.source_version(path)
+    except OSError:
+        return None
+
+
+def status(path):
+    return _jobs.get(path)
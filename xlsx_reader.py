@@ -0,0 +1,45 @@
+import openpyxl
+import pandas as pd
+
+# 📏 한 번에 메모리에 올리는 엑셀 행 수
+CHUNK_ROWS = 50000
+
+
+def _header(values):
+    # pandas.read_excel 과 같은 이름 규칙 (빈 헤더는 'Unnamed: n')
+    return [str(value) if value is not None else f"Unnamed: {i}" for i, value in enumerate(values)]
+
+
+def _chunk_frame(columns, rows):
+    width = len(columns)
+    # 행 목록을 컬럼 배열로 바로 전치 (짧은 행은 None 으로 채움)
+    values = zip(*(row[:width] + (None,) * (width - len(row)) for row in rows))
+    return pd.DataFrame(dict(zip(columns, values)), columns=columns)
+
+
+# 📖 read_only 모드로 시트를 스트리밍하면서 CHUNK_ROWS 행씩 DataFrame 으로 반환
+# (워크북 전체 DOM 을 만들지 않으므로 메모리 사용량이 청크 크기로 제한됨)
+def iter_chunks(path, chunk_rows=CHUNK_ROWS, sheet_name=None):
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _header(header)
+
+        buffer = []
+        emitted = False
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            buffer.append(row)
+            if len(buffer) >= chunk_rows:
+                yield _chunk_frame(columns, buffer)
+                buffer = []
+                emitted = True
+        if buffer or not emitted:
+            yield _chunk_frame(columns, buffer)
+    finally:
+        workbook.close()